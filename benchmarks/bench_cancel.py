@@ -0,0 +1,90 @@
+"""
+並列描画 (workers > 1) の途中でキャンセルしてから戻るまでの時間を測定する
+
+--limit 秒を超えたら終了コード 1 で終わる
+
+python -m benchmarks.bench_cancel --font-dir fonts
+"""
+
+import argparse
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+
+from reportlab.lib import pagesizes
+
+from bingo_maker.pdf import fonts
+from bingo_maker.pdf import models
+from bingo_maker.pdf import renderer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font-dir', default='fonts')
+    parser.add_argument('--num-pages', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument(
+        '--cancel-after', type=float, default=0.5, help='キャンセルまでの秒数'
+    )
+    parser.add_argument(
+        '--limit', type=float, default=1.0, help='キャンセルから戻るまでの上限'
+    )
+    args = parser.parse_args()
+
+    font_type = fonts.register_jp_fonts_in_dir(args.font_dir)[0]
+    data = models.BingoData(
+        title='ビンゴカード', items=[f'item{i}' for i in range(60)]
+    )
+    spec = models.BingoLayoutSpec(
+        page_w=pagesizes.A4[0],
+        page_h=pagesizes.A4[1],
+        card_size=10,
+        cell_size=5,
+        margin_ratio=0.05,
+        font_type=font_type,
+        title_font_size=4.0,
+        item_font_size=2.0,
+    )
+
+    cancel_event = threading.Event()
+    cancelled_at = []
+
+    def cancel() -> None:
+        cancelled_at.append(time.perf_counter())
+        cancel_event.set()
+
+    timer = threading.Timer(args.cancel_after, cancel)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = pathlib.Path(tmp_dir) / 'cancel.pdf'
+        timer.start()
+        try:
+            renderer.render_bingo_pdf(
+                args.num_pages,
+                data,
+                spec,
+                output_path,
+                workers=args.workers,
+                cancel_event=cancel_event,
+            )
+        except renderer.RenderCancelled:
+            pass
+        else:
+            raise SystemExit('キャンセルする前に描画が終わりました')
+        finally:
+            timer.cancel()
+        returned = time.perf_counter()
+        exists = output_path.exists()
+
+    elapsed = returned - cancelled_at[0]
+    print(
+        f'workers={args.workers}  キャンセルから戻るまで {elapsed:.3f} s  '
+        f'出力 {"あり" if exists else "なし"}'
+    )
+    if elapsed > args.limit or exists:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
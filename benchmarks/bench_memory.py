@@ -0,0 +1,106 @@
+"""
+chunk_pages による分割書き出しのピークメモリ (RSS) を測定する
+
+計測は resource モジュールを使うため Linux / macOS のみ対応
+
+python -m benchmarks.bench_memory --font-dir fonts
+"""
+
+import argparse
+import json
+import pathlib
+import resource
+import subprocess
+import sys
+import tempfile
+
+from reportlab.lib import pagesizes
+
+from bingo_maker.pdf import fonts
+from bingo_maker.pdf import models
+from bingo_maker.pdf import renderer
+
+
+def _render_in_child(args: argparse.Namespace) -> None:
+    font_type = fonts.register_jp_fonts_in_dir(args.font_dir)[0]
+    data = models.BingoData(
+        title='ビンゴカード', items=[f'item{i}' for i in range(60)]
+    )
+    spec = models.BingoLayoutSpec(
+        page_w=pagesizes.A4[0],
+        page_h=pagesizes.A4[1],
+        card_size=args.card_size,
+        cell_size=args.cell_size,
+        margin_ratio=0.05,
+        font_type=font_type,
+        title_font_size=4.0,
+        item_font_size=2.0,
+    )
+    renderer.render_bingo_pdf(
+        args.num_pages[0],
+        data,
+        spec,
+        args.output_path,
+        use_template=True,
+        chunk_pages=args.chunk_pages[0] or None,
+    )
+    # Linux では KiB、macOS ではバイト単位
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        max_rss //= 1024
+    print(json.dumps({'max_rss_kib': max_rss}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font-dir', default='fonts')
+    parser.add_argument('--card-size', type=int, default=10)
+    parser.add_argument('--cell-size', type=int, default=5)
+    parser.add_argument(
+        '--num-pages', type=int, nargs='+', default=[50, 100, 200, 400]
+    )
+    parser.add_argument(
+        '--chunk-pages',
+        type=int,
+        nargs='+',
+        default=[0, 10],
+        help='0 は分割なし',
+    )
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--output-path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _render_in_child(args)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for chunk_pages in args.chunk_pages:
+            for num_pages in args.num_pages:
+                output_path = pathlib.Path(tmp_dir) / 'bingo.pdf'
+                result = subprocess.run(
+                    [
+                        sys.executable,
+                        '-m',
+                        'benchmarks.bench_memory',
+                        '--child',
+                        f'--font-dir={args.font_dir}',
+                        f'--card-size={args.card_size}',
+                        f'--cell-size={args.cell_size}',
+                        f'--num-pages={num_pages}',
+                        f'--chunk-pages={chunk_pages}',
+                        f'--output-path={output_path}',
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                max_rss = json.loads(result.stdout)['max_rss_kib']
+                print(
+                    f'chunk_pages={chunk_pages:4d}  num_pages={num_pages:5d}  '
+                    f'peak RSS {max_rss / 1024:7.1f} MiB'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+optimize_size の効果 (1 ページあたりのバイト数) を測定する
+
+python -m benchmarks.bench_output_size --font-dir fonts
+"""
+
+import argparse
+import pathlib
+import tempfile
+import time
+
+from reportlab.lib import pagesizes
+
+from bingo_maker.pdf import fonts
+from bingo_maker.pdf import models
+from bingo_maker.pdf import renderer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font-dir', default='fonts')
+    parser.add_argument('--card-sizes', type=int, nargs='+', default=[2, 10])
+    parser.add_argument('--cell-size', type=int, default=5)
+    parser.add_argument('--num-pages', type=int, default=20)
+    parser.add_argument(
+        '--chunk-pages',
+        type=int,
+        nargs='+',
+        default=[0, 5],
+        help='0 は分割なし',
+    )
+    args = parser.parse_args()
+
+    font_type = fonts.register_jp_fonts_in_dir(args.font_dir)[0]
+    data = models.BingoData(
+        title='ビンゴカード', items=[f'item{i}' for i in range(60)], seed=0
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for card_size in args.card_sizes:
+            spec = models.BingoLayoutSpec(
+                page_w=pagesizes.A4[0],
+                page_h=pagesizes.A4[1],
+                card_size=card_size,
+                cell_size=args.cell_size,
+                margin_ratio=0.05,
+                font_type=font_type,
+                title_font_size=20.0 / card_size,
+                item_font_size=10.0 / card_size,
+            )
+            for chunk_pages in args.chunk_pages:
+                sizes = {}
+                for optimize_size in [False, True]:
+                    output_path = pathlib.Path(tmp_dir) / 'bingo.pdf'
+                    start = time.perf_counter()
+                    renderer.render_bingo_pdf(
+                        args.num_pages,
+                        data,
+                        spec,
+                        output_path,
+                        chunk_pages=chunk_pages or None,
+                        optimize_size=optimize_size,
+                    )
+                    elapsed = time.perf_counter() - start
+                    sizes[optimize_size] = output_path.stat().st_size
+                    print(
+                        f'card_size={card_size:2d}  '
+                        f'chunk_pages={chunk_pages:3d}  '
+                        f'optimize_size={optimize_size!s:5}  '
+                        f'{elapsed:7.3f} s  '
+                        f'{sizes[optimize_size] / args.num_pages:9.0f} B/page'
+                    )
+                print(f'  -> {1 - sizes[True] / sizes[False]:.1%} smaller')
+
+
+if __name__ == '__main__':
+    main()
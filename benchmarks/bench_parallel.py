@@ -0,0 +1,73 @@
+"""
+ページ分割による並列描画 (workers) のスケーリングを測定する
+
+python -m benchmarks.bench_parallel --font-dir fonts
+"""
+
+import argparse
+import os
+import pathlib
+import tempfile
+import time
+
+from reportlab.lib import pagesizes
+
+from bingo_maker.pdf import fonts
+from bingo_maker.pdf import models
+from bingo_maker.pdf import renderer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font-dir', default='fonts')
+    parser.add_argument('--card-size', type=int, default=10)
+    parser.add_argument('--cell-size', type=int, default=5)
+    parser.add_argument('--num-pages', type=int, default=200)
+    parser.add_argument(
+        '--workers',
+        type=int,
+        nargs='+',
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    args = parser.parse_args()
+
+    font_type = fonts.register_jp_fonts_in_dir(args.font_dir)[0]
+    data = models.BingoData(
+        title='ビンゴカード', items=[f'item{i}' for i in range(60)]
+    )
+    spec = models.BingoLayoutSpec(
+        page_w=pagesizes.A4[0],
+        page_h=pagesizes.A4[1],
+        card_size=args.card_size,
+        cell_size=args.cell_size,
+        margin_ratio=0.05,
+        font_type=font_type,
+        title_font_size=4.0,
+        item_font_size=2.0,
+    )
+
+    print(f'cpu_count={os.cpu_count()}')
+    base_elapsed = None
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for workers in args.workers:
+            output_path = pathlib.Path(tmp_dir) / f'{workers}.pdf'
+            start = time.perf_counter()
+            renderer.render_bingo_pdf(
+                args.num_pages,
+                data,
+                spec,
+                output_path,
+                use_template=True,
+                workers=workers,
+            )
+            elapsed = time.perf_counter() - start
+            base_elapsed = base_elapsed or elapsed
+            print(
+                f'workers={workers:3d}  {elapsed:7.3f} s  '
+                f'x{base_elapsed / elapsed:5.2f}  '
+                f'{output_path.stat().st_size / 1024:9.1f} KiB'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+render_bingo_pdf の各段階の時間・出力サイズ・ピークメモリを測定する
+
+card_size / cell_size / num_pages / フォントの組み合わせごとに子プロセスで
+描画し、結果を JSON で出力する。--baseline を指定すると、いずれかの段階が
+基準より --tolerance の割合を超えて遅くなった場合に終了コード 1 で終わる
+
+計測は resource モジュールを使うため Linux / macOS のみ対応
+
+python -m benchmarks.bench_pipeline --font-dir fonts --save-baseline base.json
+python -m benchmarks.bench_pipeline --font-dir fonts --baseline base.json
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import pathlib
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+from reportlab.lib import pagesizes
+from reportlab.pdfgen import canvas
+
+from bingo_maker.pdf import fonts
+from bingo_maker.pdf import models
+from bingo_maker.pdf import renderer
+
+STAGES = ['register_fonts', 'sample_cards', 'draw_cards', 'save', 'total']
+
+
+def _timed(stages: dict[str, float], name: str, func: Any) -> Any:
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stages[name] += time.perf_counter() - start
+
+    return wrapper
+
+
+def _render_in_child(args: argparse.Namespace) -> None:
+    stages = dict.fromkeys(STAGES, 0.0)
+
+    start = time.perf_counter()
+    font_types = fonts.register_jp_fonts_in_dir(args.font_dir)
+    stages['register_fonts'] = time.perf_counter() - start
+    if args.font_type not in font_types:
+        raise SystemExit(f'フォントが見つかりません：{args.font_type}')
+
+    # 描画処理そのものは変えずに、各段階の関数を計測用に包む
+    models.BingoData.sample_cards = _timed(
+        stages, 'sample_cards', models.BingoData.sample_cards
+    )
+    renderer._draw_bingo_cards = _timed(
+        stages, 'draw_cards', renderer._draw_bingo_cards
+    )
+    canvas.Canvas.save = _timed(stages, 'save', canvas.Canvas.save)
+
+    data = models.BingoData(
+        title='ビンゴカード', items=[f'item{i}' for i in range(100)], seed=0
+    )
+    spec = models.BingoLayoutSpec(
+        page_w=pagesizes.A4[0],
+        page_h=pagesizes.A4[1],
+        card_size=args.card_size,
+        cell_size=args.cell_size,
+        margin_ratio=0.05,
+        font_type=args.font_type,
+        title_font_size=4.0,
+        item_font_size=2.0,
+    )
+    start = time.perf_counter()
+    renderer.render_bingo_pdf(args.num_pages, data, spec, args.output_path)
+    stages['total'] = time.perf_counter() - start
+
+    # Linux では KiB、macOS ではバイト単位
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        max_rss //= 1024
+    print(
+        json.dumps(
+            {
+                'stages': stages,
+                'output_bytes': pathlib.Path(args.output_path).stat().st_size,
+                'max_rss_kib': max_rss,
+            }
+        )
+    )
+
+
+def _run_case(
+    args: argparse.Namespace,
+    font_type: str,
+    card_size: int,
+    cell_size: int,
+    num_pages: int,
+) -> dict[str, Any]:
+    """子プロセスで repeat 回描画し、各段階の最小値を取る"""
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for _ in range(args.repeat):
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    '-m',
+                    'benchmarks.bench_pipeline',
+                    '--child',
+                    f'--font-dir={args.font_dir}',
+                    f'--font-type={font_type}',
+                    f'--card-size={card_size}',
+                    f'--cell-size={cell_size}',
+                    f'--num-pages={num_pages}',
+                    f'--output-path={pathlib.Path(tmp_dir) / "bingo.pdf"}',
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            runs.append(json.loads(result.stdout))
+    return {
+        'font_type': font_type,
+        'card_size': card_size,
+        'cell_size': cell_size,
+        'num_pages': num_pages,
+        'stages': {
+            stage: min(run['stages'][stage] for run in runs)
+            for stage in STAGES
+        },
+        'output_bytes': runs[0]['output_bytes'],
+        'max_rss_kib': max(run['max_rss_kib'] for run in runs),
+    }
+
+
+def _case_key(case: dict[str, Any]) -> str:
+    return (
+        f'{case["font_type"]} card_size={case["card_size"]} '
+        f'cell_size={case["cell_size"]} num_pages={case["num_pages"]}'
+    )
+
+
+def _find_regressions(
+    cases: list[dict[str, Any]],
+    baseline: list[dict[str, Any]],
+    tolerance: float,
+    min_seconds: float,
+) -> list[str]:
+    """基準より tolerance の割合を超えて遅くなった段階を列挙する
+
+    min_seconds 未満の差は計測誤差として無視する
+    """
+    baseline_by_key = {_case_key(case): case for case in baseline}
+    regressions = []
+    for case in cases:
+        base = baseline_by_key.get(_case_key(case))
+        if base is None:
+            continue
+        for stage in STAGES:
+            now, then = case['stages'][stage], base['stages'][stage]
+            if now > then * (1 + tolerance) and now - then > min_seconds:
+                regressions.append(
+                    f'{_case_key(case)} {stage}: '
+                    f'{then * 1000:.1f} ms -> {now * 1000:.1f} ms'
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font-dir', default='fonts')
+    parser.add_argument(
+        '--font-types', nargs='+', help='省略時は --font-dir のすべて'
+    )
+    parser.add_argument('--card-sizes', type=int, nargs='+', default=[1, 5])
+    parser.add_argument('--cell-sizes', type=int, nargs='+', default=[3, 10])
+    parser.add_argument(
+        '--num-pages', type=int, nargs='+', default=[1, 10, 100]
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='結果の JSON (省略時は標準出力)')
+    parser.add_argument('--baseline', help='比較する基準の JSON')
+    parser.add_argument('--save-baseline', help='結果を基準として保存する')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2, help='許容する遅れの割合'
+    )
+    parser.add_argument(
+        '--min-seconds',
+        type=float,
+        default=0.005,
+        help='これより小さい差は無視する',
+    )
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--font-type', help=argparse.SUPPRESS)
+    parser.add_argument('--card-size', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--cell-size', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--output-path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.num_pages = args.num_pages[0]
+        _render_in_child(args)
+        return
+
+    font_types = args.font_types or fonts.find_jp_fonts_in_dir(args.font_dir)
+    cases = []
+    for font_type, card_size, cell_size, num_pages in itertools.product(
+        font_types, args.card_sizes, args.cell_sizes, args.num_pages
+    ):
+        case = _run_case(args, font_type, card_size, cell_size, num_pages)
+        cases.append(case)
+        print(
+            f'{_case_key(case)}  '
+            + '  '.join(
+                f'{stage} {case["stages"][stage] * 1000:8.1f} ms'
+                for stage in STAGES
+            )
+            + f'  {case["output_bytes"] / 1024:8.0f} KiB'
+            + f'  peak RSS {case["max_rss_kib"] / 1024:6.1f} MiB',
+            file=sys.stderr,
+        )
+
+    result = json.dumps({'cases': cases}, indent=2, ensure_ascii=False)
+    if args.output:
+        pathlib.Path(args.output).write_text(result, encoding='utf-8')
+    else:
+        print(result)
+    if args.save_baseline:
+        pathlib.Path(args.save_baseline).write_text(result, encoding='utf-8')
+
+    if args.baseline:
+        baseline = json.loads(
+            pathlib.Path(args.baseline).read_text(encoding='utf-8')
+        )
+        regressions = _find_regressions(
+            cases, baseline['cases'], args.tolerance, args.min_seconds
+        )
+        for regression in regressions:
+            print(f'遅くなりました：{regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
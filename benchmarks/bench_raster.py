@@ -0,0 +1,78 @@
+"""
+render_bingo_images の速度 (cards/s) と 1 枚あたりのバイト数を測定する
+
+python -m benchmarks.bench_raster --font-dir fonts --workers 1 4
+"""
+
+import argparse
+import os
+import pathlib
+import tempfile
+import time
+
+from reportlab.lib import pagesizes
+
+from bingo_maker.pdf import fonts
+from bingo_maker.pdf import models
+from bingo_maker.pdf import raster
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font-dir', default='fonts')
+    parser.add_argument('--cell-size', type=int, default=5)
+    parser.add_argument('--num-cards', type=int, default=256)
+    parser.add_argument(
+        '--formats',
+        nargs='+',
+        choices=sorted(raster.IMAGE_FORMATS),
+        default=sorted(raster.IMAGE_FORMATS),
+    )
+    parser.add_argument(
+        '--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1]
+    )
+    parser.add_argument('--dpi', type=float, default=raster.DEFAULT_DPI)
+    args = parser.parse_args()
+
+    font_type = fonts.register_jp_fonts_in_dir(args.font_dir)[0]
+    data = models.BingoData(
+        title='ビンゴカード', items=[f'item{i}' for i in range(60)], seed=0
+    )
+    spec = models.BingoLayoutSpec(
+        page_w=pagesizes.A4[0],
+        page_h=pagesizes.A4[1],
+        card_size=1,
+        cell_size=args.cell_size,
+        margin_ratio=0.05,
+        font_type=font_type,
+        title_font_size=20.0,
+        item_font_size=10.0,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for image_format in args.formats:
+            for workers in sorted(set(args.workers)):
+                output_path = pathlib.Path(tmp_dir) / f'{image_format}.zip'
+                start = time.perf_counter()
+                raster.render_bingo_images(
+                    args.num_cards,
+                    data,
+                    spec,
+                    output_path,
+                    image_format=image_format,
+                    dpi=args.dpi,
+                    workers=workers,
+                    archive=True,
+                )
+                elapsed = time.perf_counter() - start
+                print(
+                    f'format={image_format:4}  workers={workers:2d}  '
+                    f'{elapsed:7.3f} s  '
+                    f'{args.num_cards / elapsed:7.1f} cards/s  '
+                    f'{output_path.stat().st_size / args.num_cards:8.0f} '
+                    'B/card'
+                )
+
+
+if __name__ == '__main__':
+    main()
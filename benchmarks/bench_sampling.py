@@ -0,0 +1,56 @@
+"""
+カードの中身の抽選を、1 枚ずつ行う場合と seed を指定してブロックごとにまとめて行う場合で比較する
+
+python -m benchmarks.bench_sampling
+"""
+
+import argparse
+import random
+import time
+
+from bingo_maker.pdf import models
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num-cards', type=int, default=10000)
+    parser.add_argument('--cell-size', type=int, default=5)
+    parser.add_argument('--num-items', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for allow_duplicates in [False, True]:
+        data = models.BingoData(
+            title='ビンゴカード',
+            items=[f'item{i}' for i in range(args.num_items)],
+            allow_duplicates=allow_duplicates,
+            seed=0,
+        )
+        for label, sample in [
+            (
+                'per card',
+                lambda: [
+                    data.pick_cell_items(args.cell_size)
+                    for _ in range(args.num_cards)
+                ],
+            ),
+            (
+                'batch',
+                lambda: data.sample_cards(args.num_cards, args.cell_size),
+            ),
+        ]:
+            random.seed(0)
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                sample()
+                best = min(best, time.perf_counter() - start)
+            print(
+                f'allow_duplicates={allow_duplicates!s:5}  {label:8}  '
+                f'{best * 1000:8.1f} ms  '
+                f'{args.num_cards / best:10.0f} cards/s'
+            )
+
+
+if __name__ == '__main__':
+    main()
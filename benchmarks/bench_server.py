@@ -0,0 +1,115 @@
+"""
+bingo_maker.server のレイテンシとスループットを測定する
+
+--url を省略するとサービスを子プロセスで起動する。--distinct-seeds 種類の
+seed を順に使うので、それを超えたリクエストはキャッシュから返る
+
+python -m benchmarks.bench_server --font-dir fonts --concurrency 1 4 16
+"""
+
+import argparse
+from concurrent import futures
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def _post(url: str, body: dict) -> tuple[float, bool]:
+    request = urllib.request.Request(
+        f'{url}/render',
+        data=json.dumps(body).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+        cached = response.headers['X-Cache'] == 'HIT'
+    return time.perf_counter() - start, cached
+
+
+def _start_server(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            '-m',
+            'bingo_maker.server',
+            f'--font-dir={args.font_dir}',
+            '--port=0',
+            f'--workers={args.workers}',
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    start = time.perf_counter()
+    # 起動してフォントの登録などが終わると URL を出力する
+    url = process.stdout.readline().strip()
+    if not url:
+        process.kill()
+        raise SystemExit('サービスを起動できませんでした')
+    print(
+        f'startup {time.perf_counter() - start:.2f} s  {url}', file=sys.stderr
+    )
+    return process, url
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help='起動済みのサービス (省略時は起動する)')
+    parser.add_argument('--font-dir', default='fonts')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 4, 16]
+    )
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--distinct-seeds', type=int, default=20)
+    parser.add_argument('--num-pages', type=int, default=1)
+    parser.add_argument('--card-size', type=int, default=1)
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = _start_server(args)
+    try:
+        for seed_offset, concurrency in enumerate(args.concurrency):
+            # 同時実行数ごとに seed を変え、前の計測のキャッシュを使わない
+            bodies = [
+                {
+                    'items': [f'item{i}' for i in range(60)],
+                    'seed': seed_offset * args.distinct_seeds
+                    + i % args.distinct_seeds,
+                    'num_pages': args.num_pages,
+                    'card_size': args.card_size,
+                }
+                for i in range(args.requests)
+            ]
+            start = time.perf_counter()
+            with futures.ThreadPoolExecutor(concurrency) as executor:
+                results = list(
+                    executor.map(lambda body: _post(url, body), bodies)
+                )
+            elapsed = time.perf_counter() - start
+
+            latencies = sorted(latency for latency, _ in results)
+            hits = sum(cached for _, cached in results)
+            p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+            print(
+                f'concurrency={concurrency:3d}  '
+                f'{len(results) / elapsed:7.1f} req/s  '
+                f'p50 {statistics.median(latencies) * 1000:7.1f} ms  '
+                f'p95 {p95 * 1000:7.1f} ms  '
+                f'max {latencies[-1] * 1000:7.1f} ms  '
+                f'hits {hits}/{len(results)}'
+            )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+アプリ起動時のフォント処理にかかる時間を測定する
+
+新しいプロセスで、import から fonts の処理が終わるまでの時間を比較する
+- register: 全フォントを読み込んで登録する (以前の起動処理)
+- find: ファイル名だけを見て一覧を作る (現在の起動処理)
+
+python -m benchmarks.bench_startup --font-dir fonts
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+CHILD_CODE = '''
+import time
+start = time.perf_counter()
+from bingo_maker.pdf import fonts
+font_types = fonts.{func}({font_dir!r})
+print(time.perf_counter() - start, len(font_types))
+'''
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font-dir', default='fonts')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for label, func in [
+        ('register', 'register_jp_fonts_in_dir'),
+        ('find', 'find_jp_fonts_in_dir'),
+    ]:
+        elapsed_list = []
+        for _ in range(args.repeat):
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    '-c',
+                    CHILD_CODE.format(func=func, font_dir=args.font_dir),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            elapsed, num_fonts = result.stdout.split()
+            elapsed_list.append(float(elapsed))
+        print(
+            f'{label:8}  fonts={num_fonts:>3}  '
+            f'median {statistics.median(elapsed_list) * 1000:8.1f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+枠線とタイトルの Form XObject 化 (use_template) の効果を測定する
+
+python -m benchmarks.bench_template --font-dir fonts
+"""
+
+import argparse
+import pathlib
+import random
+import tempfile
+import time
+
+from reportlab.lib import pagesizes
+
+from bingo_maker.pdf import fonts
+from bingo_maker.pdf import models
+from bingo_maker.pdf import renderer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font-dir', default='fonts')
+    parser.add_argument('--card-size', type=int, default=10)
+    parser.add_argument('--cell-size', type=int, default=5)
+    parser.add_argument('--num-pages', type=int, default=100)
+    args = parser.parse_args()
+
+    font_type = fonts.register_jp_fonts_in_dir(args.font_dir)[0]
+    data = models.BingoData(
+        title='ビンゴカード', items=[f'item{i}' for i in range(60)]
+    )
+    spec = models.BingoLayoutSpec(
+        page_w=pagesizes.A4[0],
+        page_h=pagesizes.A4[1],
+        card_size=args.card_size,
+        cell_size=args.cell_size,
+        margin_ratio=0.05,
+        font_type=font_type,
+        title_font_size=4.0,
+        item_font_size=2.0,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for use_template in [False, True]:
+            random.seed(0)
+            output_path = pathlib.Path(tmp_dir) / f'{use_template}.pdf'
+            start = time.perf_counter()
+            renderer.render_bingo_pdf(
+                args.num_pages, data, spec, output_path, use_template
+            )
+            elapsed = time.perf_counter() - start
+            print(
+                f'use_template={use_template!s:5}  '
+                f'{elapsed:7.3f} s  '
+                f'{output_path.stat().st_size / 1024:9.1f} KiB'
+            )
+
+
+if __name__ == '__main__':
+    main()
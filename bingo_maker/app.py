@@ -1,29 +1,121 @@
-import tkinter as tk
+import argparse
+from collections.abc import Sequence
+import multiprocessing
+import sys
+import time
+from typing import TextIO
 
-from reportlab.lib import pagesizes
+from bingo_maker import utils
+from bingo_maker.pdf import models
 
-from bingo_maker.pdf import fonts
-from bingo_maker.ui import view
+# 最初の描画やプレビューまで読み込まないはずの重いパッケージ
+DEFERRED_PACKAGES = ('reportlab', 'pypdf', 'PIL')
+# --windowed でビルドすると標準エラー出力がないので、ファイルに書き出す
+STARTUP_PROFILE_PATH = 'outputs/startup_profile.txt'
 
 
-def main() -> None:
-    font_types = fonts.register_jp_fonts_in_dir('fonts')
+class _StartupProfiler:
+    """main を呼んでからの各段階の所要時間を記録する"""
+
+    def __init__(self) -> None:
+        # main を呼ぶまでの時間は測れないので、それまでの CPU 時間で代用する
+        self._cpu_before_main = time.process_time()
+        self._start = time.perf_counter()
+        self._marks: list[tuple[str, float, list[str]]] = []
+
+    def mark(self, name: str) -> None:
+        loaded = [p for p in DEFERRED_PACKAGES if p in sys.modules]
+        self._marks.append((name, time.perf_counter() - self._start, loaded))
+
+    def report(self, f: TextIO) -> None:
+        print(
+            f'{"before_main":14}{self._cpu_before_main * 1000:9.1f} ms'
+            '  (CPU 時間)',
+            file=f,
+        )
+        prev = 0.0
+        for name, elapsed, loaded in self._marks:
+            print(
+                f'{name:14}{(elapsed - prev) * 1000:9.1f} ms'
+                f'  累計 {elapsed * 1000:8.1f} ms'
+                f'  読み込み済み: {", ".join(loaded) or "-"}',
+                file=f,
+            )
+            prev = elapsed
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog='bingo_maker.app')
+    parser.add_argument(
+        '--profile-startup',
+        nargs='?',
+        const='-',
+        metavar='PATH',
+        help=(
+            '起動の各段階の所要時間を書き出して終了する '
+            '(- または省略時は標準エラー出力)'
+        ),
+    )
+    args = parser.parse_args(argv)
+    profiler = _StartupProfiler() if args.profile_startup else None
+
+    # 読み込みにかかる時間も測れるように、ここで読み込む
+    import tkinter as tk
+
+    from bingo_maker.pdf import fonts
+    from bingo_maker.ui import view
+
+    if profiler is not None:
+        profiler.mark('import')
+
+    font_types = fonts.find_jp_fonts_in_dir('fonts')
+    if profiler is not None:
+        profiler.mark('find_fonts')
 
     root = tk.Tk()
-    view.BingoMaker(
+    bingo_maker = view.BingoMaker(
         root,
         app_title='ビンゴメーカー',
-        app_geometry='600x480',
+        app_geometry='940x620',
         app_font_size=14,
         app_padx=0,
         app_pady=4,
-        bingo_page_width=pagesizes.A4[0],
-        bingo_page_height=pagesizes.A4[1],
-        bingo_margin_ratio=0.05,
+        bingo_page_width=models.A4[0],
+        bingo_page_height=models.A4[1],
+        bingo_margin_ratio=models.MARGIN_RATIO,
         bingo_font_types=font_types,
-    ).pack(anchor='nw')
-    root.mainloop()
+    )
+    bingo_maker.pack(anchor='nw')
+    if profiler is None:
+        root.mainloop()
+        return
+
+    profiler.mark('build_window')
+    root.update()
+    profiler.mark('first_paint')
+    bingo_maker.update_preview()
+    # フォントの登録は別のスレッドで行うので、描画されるまで待つ
+    while bingo_maker.preview.loading:
+        root.update()
+        time.sleep(0.01)
+    root.update()
+    profiler.mark('first_preview')
+    root.destroy()
+
+    if args.profile_startup != '-':
+        with open(args.profile_startup, 'w', encoding='utf-8') as f:
+            profiler.report(f)
+    elif sys.stderr is not None:
+        profiler.report(sys.stderr)
+    else:
+        with open(
+            utils.resolve_output_path(STARTUP_PROFILE_PATH, suffix='.txt'),
+            'w',
+            encoding='utf-8',
+        ) as f:
+            profiler.report(f)
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     main()
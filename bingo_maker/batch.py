@@ -0,0 +1,369 @@
+"""
+マニフェスト (.json / .toml) に並べた複数のジョブをまとめて PDF にする
+
+ジョブは大きい順に複数プロセスへ割り当てる。フォントはプロセスごとに、
+ジョブで使うものだけを 1 回ずつ登録する。同じ中身のファイルは 1 回だけ読み込む
+最後にジョブごとの所要時間と失敗をまとめた JSON を書き出す
+
+python -m bingo_maker.batch examples/batch.toml --workers 4
+
+マニフェストの例 (.toml)
+  font_dir = "fonts"
+
+  [defaults]
+  card_size = 2
+  num_pages = 10
+
+  [[jobs]]
+  name = "kura"
+  title = "くら寿司ビンゴ"
+  items = "くら寿司.txt"  # マニフェストからの相対パス
+  cell_size = 5
+"""
+
+import argparse
+from concurrent import futures
+import dataclasses
+import json
+import multiprocessing
+import os
+import pathlib
+import sys
+import time
+import tomllib
+import types
+import typing
+from typing import Any
+
+from bingo_maker import item_loader
+from bingo_maker import utils
+from bingo_maker.pdf import fonts
+from bingo_maker.pdf import models
+from bingo_maker.pdf import output_cache
+from bingo_maker.pdf import renderer
+
+DEFAULT_SUMMARY_PATH = 'outputs/batch_summary.json'
+
+
+# 項目の型 -> エラーメッセージでの呼び方
+@dataclasses.dataclass(frozen=True)
+class BatchJob:
+    name: str
+    items: str
+    title: str = 'ビンゴカード'
+    column: str | None = None
+    allow_duplicates: bool = False
+    seed: int | None = None
+    card_size: int = 2
+    cell_size: int = 5
+    num_pages: int = 2
+    font_type: str | None = None
+    title_font_size: float = 20.0
+    item_font_size: float = 10.0
+    use_template: bool = False
+    auto_fit: bool = False
+    optimize_size: bool = False
+    # 中断したジョブを、描画済みの範囲の続きから再開する
+    resume: bool = False
+    output_path: str | None = None
+
+    @property
+    def cost(self) -> int:
+        """描画するマスの数 (所要時間の見積もり)"""
+        return self.num_pages * self.card_size**2 * self.cell_size**2
+
+
+@dataclasses.dataclass(frozen=True)
+class Manifest:
+    jobs: list[BatchJob]
+    font_dir: str = 'fonts'
+    workers: int | None = None
+    summary_path: str = DEFAULT_SUMMARY_PATH
+    # 指定すると、この大きさ (MB) までの出力のキャッシュを使う
+    # (seed を指定したジョブだけ)
+    cache_mb: int | None = None
+
+
+@dataclasses.dataclass
+class JobResult:
+    name: str
+    output_path: str | None
+    ok: bool
+    seconds: float = 0.0
+    seed: int | None = None
+    num_cards: int = 0
+    error: str | None = None
+
+
+def load_manifest(file_path: str | pathlib.Path) -> Manifest:
+    """マニフェストを読み込む
+
+    中身のファイルのパスはマニフェストのあるディレクトリからの相対パスにする
+    不正な内容なら ValueError を送出する
+    """
+    file_path = pathlib.Path(file_path)
+    suffix = file_path.suffix.lower()
+    try:
+        if suffix == '.toml':
+            with open(file_path, 'rb') as f:
+                raw = tomllib.load(f)
+        elif suffix == '.json':
+            with open(file_path, encoding='utf-8') as f:
+                raw = json.load(f)
+        else:
+            raise ValueError(f'対応していないファイルです：{file_path}')
+    except (OSError, tomllib.TOMLDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f'マニフェストを読み込めません：{e}')
+    if not isinstance(raw, dict):
+        raise ValueError('マニフェストの形式が正しくありません')
+
+    raw = dict(raw)
+    defaults = raw.pop('defaults', {})
+    raw_jobs = raw.pop('jobs', [])
+    if not isinstance(defaults, dict):
+        raise ValueError('defaults はテーブル (オブジェクト) にしてください')
+    if not isinstance(raw_jobs, list):
+        raise ValueError('jobs は配列にしてください')
+    if not raw_jobs:
+        raise ValueError('jobs がありません')
+    try:
+        manifest_fields = Manifest(jobs=[], **raw)
+    except TypeError as e:
+        raise ValueError(f'マニフェストの形式が正しくありません：{e}')
+    _check_types(manifest_fields, 'マニフェスト')
+
+    jobs = []
+    names = set()
+    for i, raw_job in enumerate(raw_jobs):
+        if not isinstance(raw_job, dict):
+            raise ValueError(
+                f'{i + 1} 番目のジョブはテーブル (オブジェクト) にしてください'
+            )
+        fields = {**defaults, **raw_job}
+        fields.setdefault('name', f'job{i + 1}')
+        try:
+            job = BatchJob(**fields)
+        except TypeError as e:
+            raise ValueError(f'{fields["name"]}：{e}')
+        _check_types(job, str(job.name))
+        if job.name in names:
+            raise ValueError(f'ジョブの名前が重複しています：{job.name}')
+        names.add(job.name)
+        jobs.append(
+            dataclasses.replace(job, items=str(file_path.parent / job.items))
+        )
+    return dataclasses.replace(manifest_fields, jobs=jobs)
+
+
+def _check_types(obj: Any, owner: str) -> None:
+    """dataclass の各項目の値が、型ヒントの型 (か None) で範囲内か調べる"""
+    for field in dataclasses.fields(obj):
+        if field.type not in models.TYPE_NAMES and not isinstance(
+            field.type, types.UnionType
+        ):
+            # jobs など、別に調べる項目
+            continue
+        allowed = typing.get_args(field.type) or (field.type,)
+        try:
+            models.check_value(field.name, getattr(obj, field.name), allowed)
+        except ValueError as e:
+            raise ValueError(f'{owner}：{e}')
+
+
+def run_batch(
+    manifest: Manifest, workers: int | None = None
+) -> list[JobResult]:
+    """すべてのジョブを実行し、マニフェストの順に結果を返す
+
+    ジョブが失敗しても残りのジョブは続ける
+    出力先が同じジョブがあれば、どのジョブも始めずに ValueError を送出する
+    """
+    font_types = fonts.find_jp_fonts_in_dir(manifest.font_dir)
+    if not font_types:
+        raise ValueError(f'フォントが見つかりません：{manifest.font_dir}')
+    output_paths = {job.name: _output_path(job) for job in manifest.jobs}
+    names_by_path: dict[pathlib.Path, str] = {}
+    for name, output_path in output_paths.items():
+        other = names_by_path.setdefault(output_path.resolve(), name)
+        if other != name:
+            raise ValueError(
+                f'{other} と {name} の出力先が同じです：{output_path}'
+            )
+    workers = workers or manifest.workers or os.cpu_count() or 1
+
+    results: dict[str, JobResult] = {}
+    items_by_file: dict[tuple[str, str | None], list[str] | ValueError] = {}
+    runnable = []
+    for job in manifest.jobs:
+        output_path = output_paths[job.name]
+        try:
+            # 同じファイルを使うジョブでは、読み込んだ中身を使い回す
+            key = (job.items, job.column)
+            if key not in items_by_file:
+                try:
+                    items_by_file[key] = item_loader.load_items_from_file(*key)
+                except (OSError, ValueError) as e:
+                    items_by_file[key] = ValueError(str(e))
+            items = items_by_file[key]
+            if isinstance(items, ValueError):
+                raise items
+            if not items:
+                raise ValueError(f'ビンゴの中身がありません：{job.items}')
+            font_type = job.font_type or fonts.default_font_type(font_types)
+            if font_type not in font_types:
+                raise ValueError(f'フォントが見つかりません：{font_type}')
+        except ValueError as e:
+            results[job.name] = JobResult(
+                job.name, str(output_path), ok=False, error=str(e)
+            )
+            print(f'{job.name}  失敗：{e}', file=sys.stderr)
+            continue
+        job = dataclasses.replace(job, font_type=font_type)
+        runnable.append((job, items, output_path))
+
+    # 大きいジョブから割り当てると、最後に 1 つだけ残って待つ時間が短くなる
+    runnable.sort(key=lambda args: args[0].cost, reverse=True)
+    with futures.ProcessPoolExecutor(
+        max_workers=min(workers, max(1, len(runnable))),
+        # 登録はジョブで使うときに render_bingo_pdf が行うので、探すだけにする
+        initializer=fonts.init_worker,
+        initargs=(manifest.font_dir,),
+    ) as executor:
+        pending = {
+            executor.submit(
+                _run_job, job, items, output_path, manifest.cache_mb
+            ): (job, output_path)
+            for job, items, output_path in runnable
+        }
+        for done_i, future in enumerate(futures.as_completed(pending)):
+            job, output_path = pending[future]
+            try:
+                seconds, seed = future.result()
+                result = JobResult(
+                    job.name,
+                    str(output_path),
+                    ok=True,
+                    seconds=seconds,
+                    seed=seed,
+                    num_cards=job.num_pages * job.card_size**2,
+                )
+            except Exception as e:
+                # 描画中の例外やプロセスの異常終了も、そのジョブの失敗にする
+                result = JobResult(
+                    job.name,
+                    str(output_path),
+                    ok=False,
+                    seed=job.seed,
+                    error=f'{type(e).__name__}: {e}',
+                )
+            results[job.name] = result
+            print(
+                f'[{done_i + 1}/{len(pending)}] {job.name}  '
+                + (
+                    f'{result.seconds:.2f} s'
+                    if result.ok
+                    else f'失敗：{result.error}'
+                ),
+                file=sys.stderr,
+            )
+
+    return [results[job.name] for job in manifest.jobs]
+
+
+def _output_path(job: BatchJob) -> pathlib.Path:
+    return utils.resolve_output_path(
+        job.output_path or f'outputs/{job.name}.pdf'
+    )
+
+
+def write_summary(
+    results: list[JobResult],
+    wall_seconds: float,
+    summary_path: str | pathlib.Path,
+) -> None:
+    summary = {
+        'wall_seconds': wall_seconds,
+        'job_seconds': sum(result.seconds for result in results),
+        'succeeded': sum(result.ok for result in results),
+        'failed': sum(not result.ok for result in results),
+        'jobs': [dataclasses.asdict(result) for result in results],
+    }
+    pathlib.Path(summary_path).write_text(
+        json.dumps(summary, indent=2, ensure_ascii=False), encoding='utf-8'
+    )
+
+
+def _run_job(
+    job: BatchJob,
+    items: list[str],
+    output_path: pathlib.Path,
+    cache_mb: int | None = None,
+) -> tuple[float, int]:
+    """ジョブを 1 つ描画し、(所要時間, 使った seed) を返す"""
+    start = time.perf_counter()
+    seed = renderer.render_bingo_pdf(
+        num_pages=job.num_pages,
+        data=models.BingoData(
+            title=job.title,
+            items=items,
+            allow_duplicates=job.allow_duplicates,
+            seed=job.seed,
+        ),
+        spec=models.BingoLayoutSpec.a4(
+            card_size=job.card_size,
+            cell_size=job.cell_size,
+            font_type=job.font_type,
+            title_font_size=job.title_font_size,
+            item_font_size=job.item_font_size,
+        ),
+        output_path=output_path,
+        use_template=job.use_template,
+        auto_fit=job.auto_fit,
+        optimize_size=job.optimize_size,
+        resume=job.resume,
+        cache=(
+            None
+            if cache_mb is None
+            else output_cache.OutputCache(cache_mb * 1024 * 1024)
+        ),
+    )
+    return time.perf_counter() - start, seed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='bingo_maker.batch',
+        description='マニフェストに並べた複数のビンゴカードの PDF を作成する',
+    )
+    parser.add_argument('manifest', help='.json / .toml')
+    parser.add_argument(
+        '--workers', type=int, help='並列数 (省略時はマニフェストか CPU 数)'
+    )
+    parser.add_argument('--summary', help='結果の JSON の出力先')
+    args = parser.parse_args()
+
+    try:
+        manifest = load_manifest(args.manifest)
+        start = time.perf_counter()
+        results = run_batch(manifest, args.workers)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    wall_seconds = time.perf_counter() - start
+
+    summary_path = utils.resolve_output_path(
+        args.summary or manifest.summary_path, suffix='.json'
+    )
+    write_summary(results, wall_seconds, summary_path)
+    failed = [result for result in results if not result.ok]
+    print(
+        f'{len(results) - len(failed)}/{len(results)} 件成功  '
+        f'{wall_seconds:.2f} s'
+    )
+    print(summary_path)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,279 @@
+"""
+tkinter を使わずにビンゴカードの PDF を作成する
+
+python -m bingo_maker.cli --items examples/くら寿司.txt --num-pages 10
+python -m bingo_maker.cli --items examples/くら寿司.txt --image-format png
+"""
+
+import argparse
+from collections.abc import Callable
+from collections.abc import Sequence
+import contextlib
+import multiprocessing
+import sys
+
+from bingo_maker import item_loader
+from bingo_maker import utils
+from bingo_maker.pdf import card_ids
+from bingo_maker.pdf import fonts
+from bingo_maker.pdf import instrumentation
+from bingo_maker.pdf import models
+from bingo_maker.pdf import output_cache
+from bingo_maker.pdf import renderer
+
+# raster.IMAGE_FORMATS の形式
+# raster (Pillow の描画まわり) は画像を書き出すときだけ読み込む
+IMAGE_FORMATS = ('png', 'webp')
+
+
+def _ranged(
+    type_: Callable[[str], float], from_: float, to: float
+) -> Callable[[str], float]:
+    def parse(s: str) -> float:
+        value = type_(s)
+        if not from_ <= value <= to:
+            raise argparse.ArgumentTypeError(
+                f'{from_}以上{to}以下の値を入力してください'
+            )
+        return value
+
+    return parse
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='bingo_maker.cli', description='ビンゴカードの PDF を作成する'
+    )
+    parser.add_argument('--title', default='ビンゴカード')
+    parser.add_argument(
+        '--card-size',
+        type=_ranged(int, *models.LIMITS['card_size']),
+        default=2,
+    )
+    parser.add_argument(
+        '--cell-size',
+        type=_ranged(int, *models.LIMITS['cell_size']),
+        default=5,
+    )
+    parser.add_argument(
+        '--num-pages',
+        type=_ranged(int, *models.LIMITS['num_pages']),
+        default=2,
+    )
+    parser.add_argument(
+        '--items',
+        required=True,
+        help='ビンゴの中身のファイル (.txt / .csv / .json / .jsonl)',
+    )
+    parser.add_argument(
+        '--column', help='.csv / .json で使う列の名前 (省略時は先頭の列)'
+    )
+    parser.add_argument('--allow-duplicates', action='store_true')
+    parser.add_argument('--font-dir', default='fonts')
+    parser.add_argument('--font-type', help='省略時は Regular を優先する')
+    parser.add_argument(
+        '--title-font-size',
+        type=_ranged(float, *models.LIMITS['title_font_size']),
+        default=20.0,
+    )
+    parser.add_argument(
+        '--item-font-size',
+        type=_ranged(float, *models.LIMITS['item_font_size']),
+        default=10.0,
+    )
+    parser.add_argument('--output-path', default='outputs/bingo.pdf')
+    parser.add_argument(
+        '--save-card-set',
+        action='store_true',
+        help='読み上げ画面用にカードの組を .cards.json で保存する',
+    )
+    parser.add_argument('--use-template', action='store_true')
+    parser.add_argument(
+        '--auto-fit',
+        action='store_true',
+        help='中身ごとにマスに収まる最大の大きさで描画する',
+    )
+    parser.add_argument(
+        '--optimize-size',
+        action='store_true',
+        help='ファイルサイズを優先する (メール送付や印刷サーバー向け)',
+    )
+    parser.add_argument(
+        '--workers', type=_ranged(int, 1, 256), default=1, help='並列数'
+    )
+    parser.add_argument(
+        '--chunk-pages',
+        type=_ranged(int, 1, 100000),
+        help='このページ数ごとにディスクへ書き出す',
+    )
+    parser.add_argument(
+        '--seed',
+        type=_ranged(int, *models.LIMITS['seed']),
+        help='カードの中身と ID を決める乱数の種 (省略時はランダム)',
+    )
+    parser.add_argument(
+        '--show-card',
+        metavar='CARD_ID',
+        help='PDF を作らずに、この ID のカードの中身を表示する',
+    )
+    parser.add_argument(
+        '--metrics',
+        metavar='PATH',
+        help=(
+            '計測結果 (段階ごとの時間、ピークメモリなど) を JSON Lines で'
+            '書き出す (- は標準エラー出力)'
+        ),
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='cProfile の結果を出力先と同じ場所に .prof で保存する',
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='描画済みの範囲を記録し、中断した描画を続きから再開する',
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help=(
+            '同じ内容の PDF を以前に作っていれば、描画せずにそれを使う '
+            '(--seed を指定したときだけ)'
+        ),
+    )
+    parser.add_argument(
+        '--cache-mb',
+        type=_ranged(int, 1, 1024 * 1024),
+        default=output_cache.DEFAULT_MAX_BYTES // (1024 * 1024),
+        help='キャッシュの合計サイズの上限',
+    )
+    parser.add_argument(
+        '--image-format',
+        choices=IMAGE_FORMATS,
+        help='PDF の代わりにカードごとの画像を書き出す',
+    )
+    parser.add_argument(
+        '--dpi',
+        type=_ranged(float, 36, 1200),
+        help='画像の解像度 (省略時は 150)',
+    )
+    parser.add_argument(
+        '--archive',
+        action='store_true',
+        help='画像を 1 つの .zip にまとめる',
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = _parse_args(argv)
+
+    font_types = fonts.find_jp_fonts_in_dir(args.font_dir)
+    if not font_types:
+        raise SystemExit(f'フォントが見つかりません：{args.font_dir}')
+    font_type = args.font_type or fonts.default_font_type(font_types)
+    if font_type not in font_types:
+        raise SystemExit(f'フォントが見つかりません：{font_type}')
+
+    try:
+        items = item_loader.load_items_from_file(args.items, args.column)
+    except (OSError, ValueError) as e:
+        raise SystemExit(str(e))
+    if not items:
+        raise SystemExit(f'ビンゴの中身がありません：{args.items}')
+
+    # seed を指定しなければ描画時に決まる (再開するときは前回の seed を使う)
+    data = models.BingoData(
+        title=args.title,
+        items=items,
+        allow_duplicates=args.allow_duplicates,
+        seed=args.seed,
+    )
+    if args.show_card is not None:
+        try:
+            rows = card_ids.regenerate_card(
+                args.show_card, data, args.cell_size
+            )
+        except ValueError as e:
+            raise SystemExit(str(e))
+        for row in rows:
+            print('\t'.join(row))
+        return
+
+    spec = models.BingoLayoutSpec.a4(
+        card_size=args.card_size,
+        cell_size=args.cell_size,
+        font_type=font_type,
+        title_font_size=args.title_font_size,
+        item_font_size=args.item_font_size,
+    )
+    num_cards = args.num_pages * args.card_size**2
+    if args.image_format is not None:
+        # 出力先は .pdf を除いたディレクトリ (または .zip)
+        output_path = utils.resolve_output_path(
+            args.output_path.removesuffix('.pdf'),
+            suffix='.zip' if args.archive else '',
+        )
+        from bingo_maker.pdf import raster
+
+        raster.render_bingo_images(
+            num_cards=num_cards,
+            data=data,
+            spec=spec,
+            output_path=output_path,
+            image_format=args.image_format,
+            dpi=raster.DEFAULT_DPI if args.dpi is None else args.dpi,
+            auto_fit=args.auto_fit,
+            workers=args.workers,
+            archive=args.archive,
+        )
+        print(output_path)
+        return
+
+    output_path = utils.resolve_output_path(args.output_path)
+    with contextlib.ExitStack() as stack:
+        metrics = None
+        if args.metrics == '-':
+            metrics = instrumentation.RenderMetrics(sys.stderr)
+        elif args.metrics is not None:
+            metrics = instrumentation.RenderMetrics(
+                stack.enter_context(open(args.metrics, 'w', encoding='utf-8'))
+            )
+        seed = renderer.render_bingo_pdf(
+            num_pages=args.num_pages,
+            data=data,
+            spec=spec,
+            output_path=output_path,
+            use_template=args.use_template,
+            auto_fit=args.auto_fit,
+            workers=args.workers,
+            chunk_pages=args.chunk_pages,
+            metrics=metrics,
+            profile=args.profile,
+            optimize_size=args.optimize_size,
+            cache=(
+                output_cache.OutputCache(args.cache_mb * 1024 * 1024)
+                if args.cache
+                else None
+            ),
+            resume=args.resume,
+        )
+    print(output_path)
+
+    if args.save_card_set:
+        card_set_path = models.CardSet.path_for(output_path)
+        models.CardSet(
+            items=items,
+            allow_duplicates=args.allow_duplicates,
+            seed=seed,
+            card_size=args.card_size,
+            cell_size=args.cell_size,
+            num_cards=num_cards,
+        ).save(card_set_path)
+        print(card_set_path)
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,61 @@
+"""
+読み上げた中身からビンゴになったカードを求める
+
+中身からカードとマスの位置を引く索引を作っておき、読み上げのたびに
+その中身を含むカードだけを更新する
+"""
+
+from bingo_maker.game import lines
+
+
+class BingoCaller:
+    def __init__(
+        self, cards: list[list[int]], num_items: int, cell_size: int
+    ) -> None:
+        # index[item] はその中身がある (カードの番号, マスの番号) のリスト
+        self._index: list[list[tuple[int, int]]] = [
+            [] for _ in range(num_items)
+        ]
+        for card_i, card in enumerate(cards):
+            for cell, item in enumerate(card):
+                self._index[item].append((card_i, cell))
+
+        # マスごとに、そのマスを含む列のビットマスク
+        self._cell_line_masks = [
+            tuple(
+                mask
+                for mask in lines.line_masks(cell_size)
+                if mask >> cell & 1
+            )
+            for cell in range(cell_size**2)
+        ]
+        self._hits = [0] * len(cards)
+        self._called_set: set[int] = set()
+        self._winner_set: set[int] = set()
+        self.called: list[int] = []
+        self.winners: list[int] = []
+
+    def call(self, item: int) -> list[int]:
+        """中身を読み上げ、新しくビンゴになったカードの番号を返す"""
+        if item in self._called_set:
+            return []
+        self._called_set.add(item)
+        self.called.append(item)
+
+        new_winners: list[int] = []
+        for card_i, cell in self._index[item]:
+            hits = self._hits[card_i] | 1 << cell
+            self._hits[card_i] = hits
+            if card_i in self._winner_set:
+                continue
+            if any(
+                hits & mask == mask for mask in self._cell_line_masks[cell]
+            ):
+                self._winner_set.add(card_i)
+                new_winners.append(card_i)
+
+        self.winners += new_winners
+        return new_winners
+
+    def is_winner(self, card_i: int) -> bool:
+        return card_i in self._winner_set
@@ -0,0 +1,37 @@
+import functools
+
+
+@functools.cache
+def line_masks(cell_size: int) -> tuple[int, ...]:
+    """縦、横、斜めの各列に含まれるマスのビットマスク
+
+    マスの番号はカードの中身と同じく xi * cell_size + yi
+    """
+    columns = [
+        sum(1 << (xi * cell_size + yi) for yi in range(cell_size))
+        for xi in range(cell_size)
+    ]
+    rows = [
+        sum(1 << (xi * cell_size + yi) for xi in range(cell_size))
+        for yi in range(cell_size)
+    ]
+    diagonals = [
+        sum(1 << (i * cell_size + i) for i in range(cell_size)),
+        sum(
+            1 << (i * cell_size + cell_size - 1 - i) for i in range(cell_size)
+        ),
+    ]
+    return tuple(columns + rows + diagonals)
+
+
+@functools.cache
+def lines_by_cell(cell_size: int) -> tuple[tuple[tuple[int, ...], ...], ...]:
+    """マスごとに、そのマスを含む列をマスの番号のタプルとして返す"""
+    lines = [
+        tuple(i for i in range(cell_size**2) if mask >> i & 1)
+        for mask in line_masks(cell_size)
+    ]
+    return tuple(
+        tuple(line for line in lines if cell in line)
+        for cell in range(cell_size**2)
+    )
@@ -0,0 +1,228 @@
+"""
+ビンゴ大会のモンテカルロシミュレーション
+
+何回目の読み上げで最初の (k 人目の) 当選者が出るか、読み上げ回数ごとに
+何人が当選しているかを、印刷するカードの組をもとに推定する
+
+マスの位置ごとに「その位置が開いたカード」の集合を整数のビット列で持ち、
+読み上げのたびにビット演算でカード全体を一度に更新する
+
+処理量はカードの枚数 × 試行回数にほぼ比例し、1 コアで毎秒 150 万程度
+(5×5 マス、中身 60 個)。1 万枚 × 1000 回で約 7 秒、4 万枚 × 1000 回では
+20 秒ほどかかるので、大きいときは --workers で試行を複数のプロセスに分ける
+
+python -m bingo_maker.game.simulator --items examples/くら寿司.txt
+"""
+
+import argparse
+from collections.abc import Sequence
+from concurrent import futures
+import dataclasses
+import json
+import random
+import statistics
+
+from bingo_maker import item_loader
+from bingo_maker.game import lines
+from bingo_maker.pdf import models
+
+
+@dataclasses.dataclass
+class SimulationResult:
+    num_cards: int
+    num_items: int
+    k: int
+    # 試行ごとの、最初の当選者 / k 人目の当選者が出た読み上げ回数
+    # (最後まで出なかった場合は None)
+    first_winner_calls: list[int | None]
+    kth_winner_calls: list[int | None]
+    # 読み上げ回数 (1 始まり) ごとの当選者数の平均
+    mean_winners_by_call: list[float]
+
+    def summary(self) -> dict:
+        return {
+            'num_cards': self.num_cards,
+            'num_items': self.num_items,
+            'num_trials': len(self.first_winner_calls),
+            'first_winner': _describe(self.first_winner_calls),
+            f'winner_{self.k}': _describe(self.kth_winner_calls),
+            'mean_winners_by_call': [
+                round(w, 3) for w in self.mean_winners_by_call
+            ],
+        }
+
+
+def simulate(
+    cards: list[list[int]],
+    num_items: int,
+    cell_size: int,
+    num_trials: int,
+    k: int = 1,
+    seed: int | None = None,
+    workers: int = 1,
+) -> SimulationResult:
+    item_cells = _index_item_cells(cards, num_items)
+    seed = random.randrange(2**32) if seed is None else seed
+
+    # 試行を分割し、分割ごとに独立した乱数列を使う
+    num_chunks = max(1, min(workers, num_trials))
+    chunk_sizes = [
+        num_trials // num_chunks + (i < num_trials % num_chunks)
+        for i in range(num_chunks)
+    ]
+    args = [
+        (item_cells, num_items, cell_size, size, k, f'{seed}:{i}')
+        for i, size in enumerate(chunk_sizes)
+    ]
+    if num_chunks == 1:
+        results = [_run_trials(*args[0])]
+    else:
+        with futures.ProcessPoolExecutor(max_workers=num_chunks) as executor:
+            results = list(executor.map(_run_trials, *zip(*args)))
+
+    first_winner_calls: list[int | None] = []
+    kth_winner_calls: list[int | None] = []
+    winners_sum = [0] * num_items
+    for first, kth, sums in results:
+        first_winner_calls += first
+        kth_winner_calls += kth
+        winners_sum = [a + b for a, b in zip(winners_sum, sums)]
+
+    return SimulationResult(
+        num_cards=len(cards),
+        num_items=num_items,
+        k=k,
+        first_winner_calls=first_winner_calls,
+        kth_winner_calls=kth_winner_calls,
+        mean_winners_by_call=[s / num_trials for s in winners_sum],
+    )
+
+
+def _index_item_cells(
+    cards: list[list[int]], num_items: int
+) -> list[dict[int, int]]:
+    """中身ごとに {マスの番号: そのマスにその中身があるカードのビット列}"""
+    item_cells: list[dict[int, int]] = [{} for _ in range(num_items)]
+    for card_i, card in enumerate(cards):
+        bit = 1 << card_i
+        for cell, item in enumerate(card):
+            cells = item_cells[item]
+            cells[cell] = cells.get(cell, 0) | bit
+    return item_cells
+
+
+def _run_trials(
+    item_cells: list[dict[int, int]],
+    num_items: int,
+    cell_size: int,
+    num_trials: int,
+    k: int,
+    seed: str,
+) -> tuple[list[int | None], list[int | None], list[int]]:
+    rng = random.Random(seed)
+    cell_lines = lines.lines_by_cell(cell_size)
+    num_cells = cell_size**2
+    num_cards = max(
+        (bits.bit_length() for cells in item_cells for bits in cells.values()),
+        default=0,
+    )
+
+    first_winner_calls: list[int | None] = []
+    kth_winner_calls: list[int | None] = []
+    winners_sum = [0] * num_items
+    for _ in range(num_trials):
+        # hits[cell] はそのマスが開いたカードのビット列
+        hits = [0] * num_cells
+        winners = 0
+        num_winners = 0
+        first = kth = None
+        for call_i, item in enumerate(rng.sample(range(num_items), num_items)):
+            for cell, cards in item_cells[item].items():
+                hits[cell] |= cards
+                for line in cell_lines[cell]:
+                    completed = cards
+                    for other in line:
+                        completed &= hits[other]
+                    winners |= completed
+            num_winners = winners.bit_count()
+            winners_sum[call_i] += num_winners
+            if first is None and num_winners >= 1:
+                first = call_i + 1
+            if kth is None and num_winners >= k:
+                kth = call_i + 1
+            if num_winners == num_cards:
+                # 全員が当選したら以降の読み上げは結果に影響しない
+                for rest_i in range(call_i + 1, num_items):
+                    winners_sum[rest_i] += num_winners
+                break
+        first_winner_calls.append(first)
+        kth_winner_calls.append(kth)
+
+    return first_winner_calls, kth_winner_calls, winners_sum
+
+
+def _describe(calls: list[int | None]) -> dict:
+    finished = sorted(c for c in calls if c is not None)
+    if not finished:
+        return {'count': 0}
+    quantiles = (
+        statistics.quantiles(finished, n=20, method='inclusive')
+        if len(finished) > 1
+        else [finished[0]] * 19
+    )
+    return {
+        'count': len(finished),
+        'mean': round(statistics.fmean(finished), 3),
+        'min': finished[0],
+        'p5': quantiles[0],
+        'p50': quantiles[9],
+        'p95': quantiles[18],
+        'max': finished[-1],
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='bingo_maker.game.simulator',
+        description='ビンゴ大会の当選者の出方をシミュレーションする',
+    )
+    parser.add_argument(
+        '--items', required=True, help='ビンゴの中身のファイル'
+    )
+    parser.add_argument('--column', help='.csv / .json で使う列の名前')
+    parser.add_argument('--allow-duplicates', action='store_true')
+    parser.add_argument('--card-size', type=int, default=2)
+    parser.add_argument('--cell-size', type=int, default=5)
+    parser.add_argument('--num-pages', type=int, default=2)
+    parser.add_argument('--trials', type=int, default=1000)
+    parser.add_argument('--k', type=int, default=3, help='k 人目の当選者')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument(
+        '--workers', type=int, default=1, help='試行を分けるプロセスの数'
+    )
+    args = parser.parse_args(argv)
+
+    data = models.BingoData(
+        title='',
+        items=item_loader.load_items_from_file(args.items, args.column),
+        allow_duplicates=args.allow_duplicates,
+        # 同じ seed で印刷したカードと同じ中身になる
+        seed=args.seed,
+    )
+    cards = data.sample_cards(
+        args.card_size**2 * args.num_pages, args.cell_size
+    )
+    result = simulate(
+        cards,
+        len(data.items),
+        args.cell_size,
+        args.trials,
+        k=args.k,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    print(json.dumps(result.summary(), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
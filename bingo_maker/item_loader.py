@@ -0,0 +1,119 @@
+"""
+ビンゴの中身の読み込み
+
+.txt (1 行 1 つ)、.csv (ヘッダー付き)、.json (配列)、.jsonl (1 行 1 つ) に
+対応する。ファイル全体を読み込まずに 1 行ずつ処理し、メモリに残るのは
+重複を除いた中身だけにする
+"""
+
+from collections.abc import Callable
+from collections.abc import Iterator
+import csv
+import json
+import os
+import pathlib
+from typing import Any
+
+SUFFIXES = ('.txt', '.csv', '.json', '.jsonl')
+# 読み込める中身の種類の上限 (これを超えたら読み込みをやめる)
+MAX_ITEMS = 1_000_000
+# 進捗を通知する間隔 (行数)
+PROGRESS_INTERVAL = 10_000
+
+
+def load_items_from_file(
+    file_path: str | pathlib.Path,
+    column: str | None = None,
+    progress: Callable[[float], None] | None = None,
+    max_items: int = MAX_ITEMS,
+) -> list[str]:
+    """重複を除いて並べ替えた中身を返す
+
+    column は .csv / .json / .jsonl で使う列 (キー) の名前で、省略時は先頭の列
+    progress には読み込んだ割合 (0.0-1.0) が渡される
+    """
+    suffix = pathlib.Path(file_path).suffix.lower()
+    if suffix not in SUFFIXES:
+        raise ValueError(f'対応していないファイルです：{file_path}')
+
+    items: set[str] = set()
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        lines = _decode_lines(f, size, progress)
+        if suffix == '.txt':
+            values = _iter_txt(lines)
+        elif suffix == '.csv':
+            values = _iter_csv(lines, column)
+        elif suffix == '.jsonl':
+            values = (
+                _pick(json.loads(line), column)
+                for line in lines
+                if line.strip()
+            )
+        else:
+            # JSON の配列は標準ライブラリでは逐次読み込みできない
+            root = json.load(f)
+            if not isinstance(root, list):
+                raise ValueError(f'JSON の配列ではありません：{file_path}')
+            values = (_pick(v, column) for v in root)
+
+        for value in values:
+            item = value.strip()
+            if item and item not in items:
+                if len(items) >= max_items:
+                    raise ValueError(
+                        f'中身が多すぎます (上限 {max_items} 種類)：{file_path}'
+                    )
+                items.add(item)
+
+    if progress is not None:
+        progress(1.0)
+    return sorted(items)
+
+
+def _decode_lines(
+    f: Any, size: int, progress: Callable[[float], None] | None
+) -> Iterator[str]:
+    for line_i, raw in enumerate(f):
+        # Excel などが付ける BOM は先頭の行にだけある
+        line = raw.decode('utf-8-sig' if line_i == 0 else 'utf-8')
+        yield line
+        if progress is not None and line_i % PROGRESS_INTERVAL == 0 and size:
+            progress(f.tell() / size)
+
+
+def _iter_txt(lines: Iterator[str]) -> Iterator[str]:
+    for line in lines:
+        if not line.lstrip().startswith('#'):
+            yield line
+
+
+def _iter_csv(lines: Iterator[str], column: str | None) -> Iterator[str]:
+    reader = csv.reader(lines)
+    try:
+        header = next(reader, None)
+        if header is None:
+            return
+        if column is None:
+            column_i = 0
+        elif column in header:
+            column_i = header.index(column)
+        else:
+            raise ValueError(f'列が見つかりません：{column}')
+        for row in reader:
+            if column_i < len(row):
+                yield row[column_i]
+    except csv.Error as e:
+        raise ValueError(f'CSV を読み込めません (行 {reader.line_num})：{e}')
+
+
+def _pick(value: Any, column: str | None) -> str:
+    """JSON の値から中身を取り出す (文字列はそのまま、オブジェクトは列の値)"""
+    if isinstance(value, dict):
+        if column is None:
+            value = next(iter(value.values()), '')
+        elif column in value:
+            value = value[column]
+        else:
+            raise ValueError(f'キーが見つかりません：{column}')
+    return '' if value is None else str(value)
@@ -0,0 +1,69 @@
+"""
+カードの ID
+
+ID はジョブの seed とカードの番号をエンコードしたもので、末尾に検査用の
+1 文字が付く。カードの中身は seed と番号だけから作られるので、ID があれば
+すべてのカードを保存しておかなくても、1 枚分の中身をすぐに作り直せる
+"""
+
+from . import models
+
+# 読み間違えやすい I, L, O, U を除いた Crockford の Base32
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_VALUES = {c: i for i, c in enumerate(ALPHABET)}
+
+
+def encode_card_id(seed: int, card_i: int) -> str:
+    body = f'{_encode(seed)}-{_encode(card_i)}'
+    return body + _check_char(body)
+
+
+def decode_card_id(card_id: str) -> tuple[int, int]:
+    """ID から (seed, カードの番号) を取り出す"""
+    card_id = card_id.strip().upper()
+    body, check = card_id[:-1], card_id[-1:]
+    seed_part, _, card_part = body.partition('-')
+    if (
+        not seed_part
+        or not card_part
+        or any(c not in _VALUES for c in seed_part + card_part)
+        or _check_char(body) != check
+    ):
+        raise ValueError(f'カードの ID が正しくありません：{card_id}')
+    return _decode(seed_part), _decode(card_part)
+
+
+def regenerate_card(
+    card_id: str, data: models.BingoData, cell_size: int
+) -> list[list[str]]:
+    """ID のカードの中身を、印刷されたとおりの行 (上から) と列 (左から) で返す"""
+    seed, card_i = decode_card_id(card_id)
+    card = data.sample_card(card_i, cell_size, seed=seed)
+    # カードの中身は xi * cell_size + yi の順で、yi は下から数えている
+    return [
+        [data.items[card[xi * cell_size + yi]] for xi in range(cell_size)]
+        for yi in reversed(range(cell_size))
+    ]
+
+
+def _encode(n: int) -> str:
+    digits = ''
+    while True:
+        n, r = divmod(n, len(ALPHABET))
+        digits = ALPHABET[r] + digits
+        if n == 0:
+            return digits
+
+
+def _decode(s: str) -> int:
+    n = 0
+    for c in s:
+        n = n * len(ALPHABET) + _VALUES[c]
+    return n
+
+
+def _check_char(body: str) -> str:
+    total = sum(
+        (i + 1) * _VALUES[c] for i, c in enumerate(body) if c in _VALUES
+    )
+    return ALPHABET[total % len(ALPHABET)]
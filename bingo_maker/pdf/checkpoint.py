@@ -0,0 +1,107 @@
+"""
+中断しても続きから描画できるように、描画済みの範囲を記録する
+
+出力先の隣の '{出力ファイル名}.parts' ディレクトリに範囲ごとの PDF と
+manifest.json を置く。manifest.json にはジョブのハッシュ、seed、範囲ごとの
+最初のカードの番号・ページ数・書き終えたファイルのサイズを記録する
+カードの中身は seed とカードの番号だけから決まるので、どの範囲からでも
+中断しなかった場合と同じ内容で描画を再開できる
+"""
+
+import json
+import os
+import pathlib
+import shutil
+from typing import Any
+
+MANIFEST_NAME = 'manifest.json'
+# 変更したら古い記録は使わない
+MANIFEST_VERSION = 2
+
+
+def checkpoint_dir(output_path: str | pathlib.Path) -> pathlib.Path:
+    output_path = pathlib.Path(output_path)
+    return output_path.with_name(output_path.name + '.parts')
+
+
+class Checkpoint:
+    def __init__(self, dir_path: pathlib.Path) -> None:
+        self.dir_path = dir_path
+        self._manifest = self._load()
+
+    @property
+    def seed(self) -> int | None:
+        """前回の seed (seed を指定せずに再開したときに使う)"""
+        return None if self._manifest is None else self._manifest['seed']
+
+    def start(
+        self,
+        key: str,
+        seed: int,
+        shard_sizes: list[int],
+        first_cards: list[int],
+    ) -> set[int]:
+        """書き終えた範囲の番号を返す
+
+        同じジョブ (key と範囲の分け方が同じ) の記録がなければ、
+        ディレクトリを作り直す
+        """
+        if (
+            self._manifest is not None
+            and self._manifest['key'] == key
+            and [chunk['num_pages'] for chunk in self._manifest['chunks']]
+            == shard_sizes
+        ):
+            return {
+                i
+                for i, chunk in enumerate(self._manifest['chunks'])
+                if chunk['bytes'] is not None
+                and self._chunk_size(i) == chunk['bytes']
+            }
+
+        shutil.rmtree(self.dir_path, ignore_errors=True)
+        self.dir_path.mkdir(parents=True)
+        self._manifest = {
+            'version': MANIFEST_VERSION,
+            'key': key,
+            'seed': seed,
+            'chunks': [
+                {'first_card': first, 'num_pages': size, 'bytes': None}
+                for size, first in zip(shard_sizes, first_cards)
+            ],
+        }
+        self._save()
+        return set()
+
+    def chunk_path(self, i: int) -> pathlib.Path:
+        return self.dir_path / f'{i:05d}.pdf'
+
+    def mark_done(self, i: int) -> None:
+        self._manifest['chunks'][i]['bytes'] = self._chunk_size(i)
+        self._save()
+
+    def remove(self) -> None:
+        shutil.rmtree(self.dir_path, ignore_errors=True)
+
+    def _chunk_size(self, i: int) -> int | None:
+        try:
+            return self.chunk_path(i).stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> dict[str, Any] | None:
+        try:
+            manifest = json.loads(
+                (self.dir_path / MANIFEST_NAME).read_text(encoding='utf-8')
+            )
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def _save(self) -> None:
+        # 書き込み中に止まっても、前の記録が残るように置き換える
+        tmp_path = self.dir_path / (MANIFEST_NAME + '.tmp')
+        tmp_path.write_text(json.dumps(self._manifest), encoding='utf-8')
+        os.replace(tmp_path, self.dir_path / MANIFEST_NAME)
@@ -0,0 +1,130 @@
+"""
+TTFont の解析結果をディスクにキャッシュする
+
+キャッシュはフォントのパス、ファイルサイズ、更新日時、reportlab のバージョンを
+キーとし、フォントが更新されると同じパスの古いエントリは削除される
+
+TTFontFace の属性や TTFont.__init__ の中身など reportlab の非公開の実装に
+依存しているので、reportlab のバージョンが変わるとキャッシュは使わない。
+読み込みに失敗した場合も、キャッシュを消して普通に解析し直す
+"""
+
+import fnmatch
+import functools
+import hashlib
+import operator
+import os
+import pathlib
+import pickle
+import tempfile
+from typing import Any
+import weakref
+
+import reportlab
+from reportlab import rl_config
+from reportlab.pdfbase import ttfonts
+
+from bingo_maker import utils
+
+# 解析結果に含まれるが、キャッシュせずに読み込み時に作り直すもの
+_EXCLUDED_ATTRS = ('_ttf_data', '_pdfScale')
+
+
+def load_font(name: str, file_path: pathlib.Path) -> ttfonts.TTFont:
+    """キャッシュが使えなければ (ディレクトリを作れないなど)、毎回解析する"""
+    stat = file_path.stat()
+    path_key = _digest(str(file_path.resolve()))
+    entry_key = _digest(
+        f'{stat.st_size}:{stat.st_mtime_ns}:{reportlab.Version}'
+    )
+    try:
+        cache_path = (
+            utils.resolve_cache_dir('fonts') / f'{path_key}-{entry_key}.pickle'
+        )
+        cache_exists = cache_path.exists()
+    except OSError:
+        return ttfonts.TTFont(name, str(file_path))
+
+    if cache_exists:
+        try:
+            return _build_font(name, _load_face(cache_path, file_path))
+        except Exception:
+            # 壊れたキャッシュは作り直す
+            try:
+                cache_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    font = ttfonts.TTFont(name, str(file_path))
+    _store_face(font.face, cache_path, path_key)
+    return font
+
+
+def _digest(s: str) -> str:
+    return hashlib.sha256(s.encode()).hexdigest()[:16]
+
+
+def _load_face(
+    cache_path: pathlib.Path, file_path: pathlib.Path
+) -> ttfonts.TTFontFace:
+    with open(cache_path, 'rb') as f:
+        attrs: dict[str, Any] = pickle.load(f)
+
+    face = ttfonts.TTFontFace.__new__(ttfonts.TTFontFace)
+    face.__dict__.update(attrs)
+    face._ttf_data = file_path.read_bytes()
+    face._pdfScale = (
+        _identity
+        if face.unitsPerEm == 1000
+        else functools.partial(operator.mul, 1000 / face.unitsPerEm)
+    )
+    return face
+
+
+def _store_face(
+    face: ttfonts.TTFontFace, cache_path: pathlib.Path, path_key: str
+) -> None:
+    attrs = {k: v for k, v in vars(face).items() if k not in _EXCLUDED_ATTRS}
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            dir=cache_path.parent, suffix='.tmp', delete=False
+        ) as f:
+            tmp_path = pathlib.Path(f.name)
+            pickle.dump(attrs, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+        tmp_path = None
+
+        for stale_path in cache_path.parent.glob(f'{path_key}-*.pickle'):
+            if stale_path != cache_path:
+                stale_path.unlink(missing_ok=True)
+    except Exception:
+        # キャッシュに書き込めなくても (pickle できない属性も含む)、
+        # フォントの登録は続ける
+        pass
+    finally:
+        # 書きかけのファイルを残さない
+        if tmp_path is not None:
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+def _build_font(name: str, face: ttfonts.TTFontFace) -> ttfonts.TTFont:
+    # ttfonts.TTFont.__init__ のうち、フォントファイルの解析以外の部分
+    # (reportlab 5.0 に合わせている。変わった場合は呼び出し側で解析し直す)
+    font = ttfonts.TTFont.__new__(ttfonts.TTFont)
+    font.fontName = name
+    font.face = face
+    font.encoding = ttfonts.TTEncoding()
+    font.state = weakref.WeakKeyDictionary()
+    font._asciiReadable = rl_config.ttfAsciiReadable
+    font.shapable = not any(
+        fnmatch.fnmatch(name, pattern) for pattern in ttfonts.unShapedFontGlob
+    )
+    return font
+
+
+def _identity(x: float) -> float:
+    return x
@@ -1,10 +1,105 @@
+from collections.abc import Sequence
+import copy
 import pathlib
-
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase import ttfonts
+import threading
+import weakref
 
 from bingo_maker import utils
 
+# reportlab の読み込みは重いので、アプリの起動時 (find_jp_fonts_in_dir) には
+# 読み込まず、フォントを登録するときに読み込む
+
+# 使った文字のグリフだけを埋め込む別名のフォントに付ける接尾辞
+SUBSETTING_SUFFIX = '#subset'
+
+_font_paths: dict[str, pathlib.Path] = {}
+# 登録済みのフォント (reportlab を読み込まずに調べられるようにする)
+_registered: set[str] = set()
+_register_lock = threading.Lock()
+
+
+def find_jp_fonts_in_dir(relative_path: str) -> list[str]:
+    """ファイル名だけを見てフォントを探す (読み込みは ensure_registered で行う)"""
+    dir_path = utils.resolve_resource_path(relative_path)
+
+    found: list[str] = []
+    for file_path in dir_path.rglob('*.[ot]tf'):
+        _font_paths[file_path.stem] = file_path
+        found.append(file_path.stem)
+
+    return sorted(found)
+
+
+def default_font_type(font_types: Sequence[str]) -> str:
+    """指定がないときに使うフォント (Regular を優先する)"""
+    return next(
+        (ft for ft in font_types if 'regular' in ft.lower()), font_types[0]
+    )
+
+
+def init_worker(
+    font_dir: str | None = None,
+    font_paths: Sequence[str | pathlib.Path | None] = (),
+) -> None:
+    """ProcessPoolExecutor の initializer
+
+    font_dir のフォントは探すだけにし、使うときに ensure_registered で登録する
+    font_paths のフォントはすぐに登録する (None は reportlab の標準フォント)
+    """
+    if font_dir is not None:
+        find_jp_fonts_in_dir(font_dir)
+    for font_path in font_paths:
+        if font_path is not None:
+            register_jp_font(font_path)
+
+
+def ensure_registered(font_type: str) -> None:
+    """見つけたフォントファイルか reportlab の標準フォントを登録する
+
+    どちらでもなければ ValueError を送出する
+    """
+    from reportlab.pdfbase import pdfmetrics
+
+    with _register_lock:
+        if font_type in _font_paths:
+            if font_type not in pdfmetrics.getRegisteredFontNames():
+                register_jp_font(_font_paths[font_type])
+        else:
+            try:
+                # Helvetica などの標準フォントは、取得すると登録される
+                pdfmetrics.getFont(font_type)
+            except KeyError:
+                raise ValueError(f'フォントが見つかりません：{font_type}')
+        _registered.add(font_type)
+
+
+def is_registered(font_type: str) -> bool:
+    """ensure_registered を呼んでも待たずに済むか"""
+    return font_type in _registered
+
+
+def ensure_subsetting_font(font_type: str) -> str:
+    """使った文字のグリフだけを埋め込む別名のフォントを登録し、その名前を返す
+
+    reportlab は文書ごとにこの設定を変えられないため、フォント自体を分ける
+    標準フォントは埋め込まないので、そのままの名前を返す
+    """
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase import ttfonts
+
+    name = font_type + SUBSETTING_SUFFIX
+    with _register_lock:
+        if name not in pdfmetrics.getRegisteredFontNames():
+            font = pdfmetrics.getFont(font_type)
+            if not isinstance(font, ttfonts.TTFont):
+                return font_type
+            font = copy.copy(font)
+            font.fontName = name
+            font._asciiReadable = False
+            font.state = weakref.WeakKeyDictionary()
+            pdfmetrics.registerFont(font)
+    return name
+
 
 def register_jp_fonts_in_dir(relative_path: str) -> list[str]:
     dir_path = utils.resolve_resource_path(relative_path)
@@ -16,6 +111,23 @@ def register_jp_fonts_in_dir(relative_path: str) -> list[str]:
     return sorted(registered)
 
 
+def register_jp_font(file_path: str | pathlib.Path) -> str:
+    registered: list[str] = []
+    _register_jp_font(pathlib.Path(file_path), registered)
+    return registered[0]
+
+
+def get_font_path(font_type: str) -> pathlib.Path | None:
+    """ファイルから登録していないフォント (標準フォントなど) なら None"""
+    return _font_paths.get(font_type)
+
+
 def _register_jp_font(file_path: pathlib.Path, registered: list[str]) -> None:
-    pdfmetrics.registerFont(ttfonts.TTFont(file_path.stem, str(file_path)))
+    from reportlab.pdfbase import pdfmetrics
+
+    from . import font_cache
+
+    pdfmetrics.registerFont(font_cache.load_font(file_path.stem, file_path))
+    _font_paths[file_path.stem] = file_path
+    _registered.add(file_path.stem)
     registered.append(file_path.stem)
@@ -0,0 +1,81 @@
+"""
+描画処理の計測
+
+render_bingo_pdf に RenderMetrics を渡すと、段階ごとの所要時間と
+ページごとのカウンタを集計し、sink があれば JSON Lines で書き出す
+summary にはプロセスのピークメモリ (RSS) も含める (Windows では None)
+"""
+
+import collections
+from collections.abc import Generator
+import contextlib
+import json
+import sys
+import time
+from typing import Any
+from typing import TextIO
+
+
+class RenderMetrics:
+    def __init__(self, sink: TextIO | None = None) -> None:
+        # 段階ごとの合計秒数
+        self.spans: dict[str, float] = collections.defaultdict(float)
+        self.counters: dict[str, int] = collections.defaultdict(int)
+        self._sink = sink
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> Generator[None, None, None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] += time.perf_counter() - start
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def merge(self, other: 'RenderMetrics') -> None:
+        """別プロセスで集計した値を足し込む"""
+        for name, seconds in other.spans.items():
+            self.spans[name] += seconds
+        for name, n in other.counters.items():
+            self.counters[name] += n
+
+    def emit(self, event: str, **fields: Any) -> None:
+        if self._sink is not None:
+            self._sink.write(
+                json.dumps({'event': event, **fields}, ensure_ascii=False)
+                + '\n'
+            )
+            self._sink.flush()
+
+    def summary(self, seconds: float) -> dict[str, Any]:
+        pages = self.counters['pages']
+        cards = self.counters['cards']
+        return {
+            'seconds': seconds,
+            'pages_per_sec': pages / seconds if seconds else 0.0,
+            'cards_per_sec': cards / seconds if seconds else 0.0,
+            'spans': dict(self.spans),
+            'counters': dict(self.counters),
+            'max_rss_kib': max_rss_kib(),
+            'children_max_rss_kib': max_rss_kib(children=True),
+        }
+
+
+def max_rss_kib(children: bool = False) -> int | None:
+    """このプロセス (children=True なら終了した子プロセスのうち最大) の
+    ピーク RSS。resource モジュールのない Windows では None
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    max_rss = resource.getrusage(
+        resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    ).ru_maxrss
+    # Linux では KiB、macOS ではバイト単位
+    if sys.platform == 'darwin':
+        max_rss //= 1024
+    return max_rss
@@ -0,0 +1,235 @@
+"""
+複数の PDF をページ順に結合する
+
+結合済みのオブジェクトは読み込んだそばから出力ファイルへ書き出すため、
+メモリに保持するのは各オブジェクトのオフセットとページの参照だけになる
+dedupe=True なら、参照先まで含めて内容が同じオブジェクト (フォントの辞書・
+FontDescriptor・フォントのデータなど) を 1 つにまとめる
+文書情報 (/Info) は最初のファイルのものを使う
+"""
+
+import copy
+import hashlib
+import io
+import pathlib
+from typing import Any
+from typing import BinaryIO
+
+import pypdf
+from pypdf import generic
+
+
+def merge_pdf_files(
+    input_paths: list[pathlib.Path],
+    output_path: str | pathlib.Path,
+    dedupe: bool = False,
+) -> None:
+    with open(output_path, 'wb') as f:
+        writer = _StreamingPdfWriter(f, dedupe)
+        for input_path in input_paths:
+            writer.append(input_path)
+        writer.close()
+
+
+class _StreamingPdfWriter:
+    def __init__(self, f: BinaryIO, dedupe: bool = False) -> None:
+        self._f = f
+        self._offsets: list[int] = []
+        self._page_ids: list[int] = []
+        self._info_id: int | None = None
+        # 参照先まで含めた内容のハッシュ -> 出力ファイル内のオブジェクト番号
+        self._shared: dict[bytes, int] | None = {} if dedupe else None
+
+        self._f.write(b'%PDF-1.4\n%\x93\x8c\x8b\x9e\n')
+        self._pages_id = self._reserve_id()
+
+    def append(self, input_path: pathlib.Path) -> None:
+        reader = pypdf.PdfReader(input_path)
+        # 入力ファイル内のオブジェクト番号 -> 出力ファイル内のオブジェクト番号
+        id_map: dict[int, int] = {}
+        # 入力ファイル内のオブジェクト番号 -> 内容のハッシュ (まとめられなければ None)
+        keys: dict[int, bytes | None] = {}
+        for page in reader.pages:
+            self._page_ids.append(
+                self._copy_ref(page.indirect_reference, id_map, keys)
+            )
+        info = reader.trailer.get('/Info')
+        if self._info_id is None and isinstance(info, generic.IndirectObject):
+            self._info_id = self._copy_ref(info, id_map, keys)
+
+    def close(self) -> None:
+        self._write_object(
+            self._pages_id,
+            generic.DictionaryObject(
+                {
+                    generic.NameObject('/Type'): generic.NameObject('/Pages'),
+                    generic.NameObject('/Kids'): generic.ArrayObject(
+                        self._ref(i) for i in self._page_ids
+                    ),
+                    generic.NameObject('/Count'): generic.NumberObject(
+                        len(self._page_ids)
+                    ),
+                }
+            ),
+        )
+        root_id = self._reserve_id()
+        self._write_object(
+            root_id,
+            generic.DictionaryObject(
+                {
+                    generic.NameObject('/Type'): generic.NameObject(
+                        '/Catalog'
+                    ),
+                    generic.NameObject('/Pages'): self._ref(self._pages_id),
+                }
+            ),
+        )
+
+        xref_offset = self._f.tell()
+        self._f.write(f'xref\n0 {len(self._offsets) + 1}\n'.encode())
+        self._f.write(b'0000000000 65535 f \n')
+        for offset in self._offsets:
+            self._f.write(f'{offset:010d} 00000 n \n'.encode())
+        self._f.write(b'trailer\n')
+        trailer = generic.DictionaryObject(
+            {
+                generic.NameObject('/Size'): generic.NumberObject(
+                    len(self._offsets) + 1
+                ),
+                generic.NameObject('/Root'): self._ref(root_id),
+            }
+        )
+        if self._info_id is not None:
+            trailer[generic.NameObject('/Info')] = self._ref(self._info_id)
+        trailer.write_to_stream(self._f)
+        self._f.write(f'\nstartxref\n{xref_offset}\n%%EOF\n'.encode())
+
+    def _copy_ref(
+        self,
+        ref: generic.IndirectObject,
+        id_map: dict[int, int],
+        keys: dict[int, bytes | None],
+    ) -> int:
+        # 参照先を先に書き出す必要はないので、見つけた順に書き出していく
+        pending: list[tuple[int, Any]] = []
+        self._copy(ref, id_map, keys, pending)
+        while pending:
+            obj_id, obj = pending.pop()
+            self._write_object(obj_id, self._copy(obj, id_map, keys, pending))
+        return id_map[ref.idnum]
+
+    def _copy(
+        self,
+        obj: Any,
+        id_map: dict[int, int],
+        keys: dict[int, bytes | None],
+        pending: list[tuple[int, Any]],
+    ) -> Any:
+        if isinstance(obj, generic.IndirectObject):
+            if obj.idnum not in id_map:
+                key = self._content_key(obj, keys, set())
+                if key is not None and key in self._shared:
+                    id_map[obj.idnum] = self._shared[key]
+                else:
+                    id_map[obj.idnum] = self._reserve_id()
+                    if key is not None:
+                        self._shared[key] = id_map[obj.idnum]
+                    pending.append((id_map[obj.idnum], obj.get_object()))
+            return self._ref(id_map[obj.idnum])
+
+        if isinstance(obj, generic.DictionaryObject):
+            copied = (
+                copy.copy(obj)
+                if isinstance(obj, generic.StreamObject)
+                else generic.DictionaryObject()
+            )
+            for key, value in obj.items():
+                if key == '/Parent':
+                    continue
+                copied[key] = self._copy(value, id_map, keys, pending)
+            if obj.get('/Type') == '/Page':
+                copied[generic.NameObject('/Parent')] = self._ref(
+                    self._pages_id
+                )
+            return copied
+
+        if isinstance(obj, generic.ArrayObject):
+            return generic.ArrayObject(
+                self._copy(value, id_map, keys, pending) for value in obj
+            )
+
+        return obj
+
+    def _content_key(
+        self,
+        obj: Any,
+        keys: dict[int, bytes | None],
+        visiting: set[int],
+    ) -> bytes | None:
+        """参照先の内容まで含めたハッシュ
+
+        ページやページツリー、循環した参照を含むものはまとめないので None
+        (dedupe=False なら常に None)
+        """
+        if self._shared is None:
+            return None
+        if isinstance(obj, generic.IndirectObject):
+            if obj.idnum in keys:
+                return keys[obj.idnum]
+            if obj.idnum in visiting:
+                return None
+            visiting.add(obj.idnum)
+            key = self._content_key(obj.get_object(), keys, visiting)
+            visiting.discard(obj.idnum)
+            keys[obj.idnum] = key
+            return key
+
+        digest = hashlib.sha256()
+        if isinstance(obj, generic.DictionaryObject):
+            if '/Parent' in obj or obj.get('/Type') in ('/Page', '/Pages'):
+                return None
+            digest.update(
+                b'S' if isinstance(obj, generic.StreamObject) else b'D'
+            )
+            for name in sorted(obj):
+                value = self._content_key(obj[name], keys, visiting)
+                if value is None:
+                    return None
+                _update(digest, name.encode())
+                _update(digest, value)
+            if isinstance(obj, generic.StreamObject):
+                # 圧縮したままのデータで比べる
+                _update(digest, obj._data)
+        elif isinstance(obj, generic.ArrayObject):
+            digest.update(b'A')
+            for value in obj:
+                value = self._content_key(value, keys, visiting)
+                if value is None:
+                    return None
+                _update(digest, value)
+        else:
+            buffer = io.BytesIO()
+            obj.write_to_stream(buffer)
+            digest.update(b'V')
+            _update(digest, buffer.getvalue())
+        return digest.digest()
+
+    def _reserve_id(self) -> int:
+        self._offsets.append(0)
+        return len(self._offsets)
+
+    def _write_object(self, obj_id: int, obj: Any) -> None:
+        self._offsets[obj_id - 1] = self._f.tell()
+        self._f.write(f'{obj_id} 0 obj\n'.encode())
+        obj.write_to_stream(self._f)
+        self._f.write(b'\nendobj\n')
+
+    @staticmethod
+    def _ref(obj_id: int) -> generic.IndirectObject:
+        return generic.IndirectObject(obj_id, 0, None)
+
+
+def _update(digest: Any, data: bytes) -> None:
+    # 区切りがずれて別の内容と同じハッシュにならないよう、長さを前に付ける
+    digest.update(len(data).to_bytes(8, 'big'))
+    digest.update(data)
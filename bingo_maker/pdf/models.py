@@ -1,5 +1,73 @@
 import dataclasses
+import functools
+import json
+import pathlib
 import random
+import types
+from typing import Any
+
+# reportlab.lib.pagesizes.A4 と同じ値 (pt)
+# アプリの起動を速くするため、reportlab を読み込まずに使えるようにする
+_MM = 72 / 2.54 * 0.1
+A4 = (210 * _MM, 297 * _MM)
+MARGIN_RATIO = 0.05
+# 数値の設定 -> 範囲 (CLI・バッチ・サービスで共通)
+LIMITS = {
+    'card_size': (1, 10),
+    'cell_size': (2, 10),
+    'num_pages': (1, 100000),
+    'title_font_size': (0.5, 50),
+    'item_font_size': (0.5, 50),
+    'seed': (0, 2**32 - 1),
+}
+# 設定の値に使える型 -> エラーメッセージでの呼び方
+TYPE_NAMES = {
+    str: '文字列',
+    int: '整数',
+    float: '数値',
+    bool: '真偽値 (true / false)',
+    list: '配列',
+}
+
+
+def check_value(name: str, value: Any, allowed: tuple[type, ...]) -> Any:
+    """設定の値が allowed の型で、LIMITS の範囲内か調べる (バッチ・サービスで共通)
+
+    bool は int の一種だが、数値の項目には使えないようにする
+    float の項目の int は float にして返す。不正なら ValueError を送出する
+    """
+    if value is None and types.NoneType in allowed:
+        return value
+    if isinstance(value, bool):
+        ok = bool in allowed
+    else:
+        ok = any(
+            isinstance(value, (int, float) if t is float else t)
+            for t in allowed
+            if t in TYPE_NAMES
+        )
+    if not ok:
+        expected = next(t for t in allowed if t in TYPE_NAMES)
+        raise ValueError(f'{name} は{TYPE_NAMES[expected]}にしてください')
+    if name in LIMITS:
+        from_, to = LIMITS[name]
+        if not from_ <= value <= to:
+            raise ValueError(f'{name} は{from_}以上{to}以下の値にしてください')
+    if float in allowed and not isinstance(value, (bool, float)):
+        value = float(value)
+    return value
+
+
+# カードの ID の文字の大きさ (タイトルに対する比率)
+CARD_ID_FONT_RATIO = 0.5
+
+# 1 つの乱数列から続けて作るカードの数
+# ID からカードを作り直すときは、そのカードのブロックの先頭から作る
+CARD_BLOCK_SIZE = 256
+
+
+def new_seed() -> int:
+    return random.getrandbits(32)
 
 
 @dataclasses.dataclass
@@ -7,6 +75,8 @@ class BingoData:
     title: str
     items: list[str]
     allow_duplicates: bool = False
+    # 指定すると、各カードの中身は seed とカードの番号だけから決まる
+    seed: int | None = None
 
     def pick_cell_items(self, cell_size: int) -> list[str]:
         n = cell_size**2
@@ -16,6 +86,61 @@ class BingoData:
             else random.sample
         )(self.items, k=n)
 
+    def sample_card(
+        self, card_i: int, cell_size: int, seed: int | None = None
+    ) -> list[int]:
+        """seed とカードの番号から 1 枚のカードの中身を作り直す"""
+        block_i, offset = divmod(card_i, CARD_BLOCK_SIZE)
+        seed = self.seed if seed is None else seed
+        return self._sample_block(seed, block_i, cell_size, offset + 1)[-1]
+
+    def sample_cards(
+        self, num_cards: int, cell_size: int, start: int = 0
+    ) -> list[list[int]]:
+        """start 番目から num_cards 枚のカードの中身を items のインデックスで返す
+
+        CARD_BLOCK_SIZE 枚ずつ 1 つの乱数列から作るので、カードの中身は seed と
+        カードの番号だけから決まる (seed が None なら毎回ランダム)
+        """
+        seed = new_seed() if self.seed is None else self.seed
+        cards: list[list[int]] = []
+        end = start + num_cards
+        for block_i in range(
+            start // CARD_BLOCK_SIZE, -(-end // CARD_BLOCK_SIZE)
+        ):
+            block_start = block_i * CARD_BLOCK_SIZE
+            block = self._sample_block(
+                seed,
+                block_i,
+                cell_size,
+                min(CARD_BLOCK_SIZE, end - block_start),
+            )
+            cards.extend(block[max(0, start - block_start) :])
+        return cards
+
+    def _sample_block(
+        self, seed: int, block_i: int, cell_size: int, num_cards: int
+    ) -> list[list[int]]:
+        """ブロックの先頭から num_cards 枚を作る"""
+        rng = random.Random(f'{seed}:{block_i}')
+        n = cell_size**2
+        population = range(len(self.items))
+        if self.allow_duplicates or len(self.items) < n:
+            flat = rng.choices(population, k=num_cards * n)
+            return [flat[i : i + n] for i in range(0, num_cards * n, n)]
+        # 部分的な Fisher-Yates。rng.sample を毎回呼ぶより速い
+        # pool は前のカードの並びのまま使っても一様に選ばれる
+        random_ = rng.random
+        pool = list(population)
+        size = len(pool)
+        cards = []
+        for _ in range(num_cards):
+            for j in range(n):
+                k = j + int(random_() * (size - j))
+                pool[j], pool[k] = pool[k], pool[j]
+            cards.append(pool[:n])
+        return cards
+
 
 @dataclasses.dataclass
 class BingoLayoutSpec:
@@ -32,19 +157,98 @@ class BingoLayoutSpec:
     card_h: float = dataclasses.field(init=False)
     margin_w: float = dataclasses.field(init=False)
     margin_h: float = dataclasses.field(init=False)
+    card_id_font_size: float = dataclasses.field(init=False)
+    grid_y: float = dataclasses.field(init=False)
     grid_w: float = dataclasses.field(init=False)
     grid_h: float = dataclasses.field(init=False)
     cell_w: float = dataclasses.field(init=False)
     cell_h: float = dataclasses.field(init=False)
 
+    @classmethod
+    def a4(
+        cls,
+        card_size: int,
+        cell_size: int,
+        font_type: str,
+        title_font_size: float,
+        item_font_size: float,
+    ) -> 'BingoLayoutSpec':
+        """A4 に既定の余白で並べる"""
+        return cls(
+            page_w=A4[0],
+            page_h=A4[1],
+            card_size=card_size,
+            cell_size=cell_size,
+            margin_ratio=MARGIN_RATIO,
+            font_type=font_type,
+            title_font_size=title_font_size,
+            item_font_size=item_font_size,
+        )
+
     def __post_init__(self):
         self.card_w = self.page_w / self.card_size
         self.card_h = self.page_h / self.card_size
         self.margin_w = self.card_w * self.margin_ratio
         self.margin_h = self.card_h * self.margin_ratio
+        self.card_id_font_size = self.title_font_size * CARD_ID_FONT_RATIO
+        # タイトルは上、カードの ID は下にそれぞれ 1 行取り、間にマスを並べる
+        self.grid_y = self.margin_h + self.card_id_font_size * 1.4
         self.grid_w = self.card_w - 2 * self.margin_w
         self.grid_h = (
-            self.card_h - 2 * self.margin_h - self.title_font_size * 1.4
+            self.card_h
+            - 2 * self.margin_h
+            - (self.title_font_size + self.card_id_font_size) * 1.4
         )
         self.cell_w = self.grid_w / self.cell_size
         self.cell_h = self.grid_h / self.cell_size
+
+
+# 同じ名前の .json を上書きしないよう、専用の拡張子にする
+CARD_SET_SUFFIX = '.cards.json'
+
+
+@dataclasses.dataclass
+class CardSet:
+    """印刷したカードの組 (読み上げ画面で使う)
+
+    中身は持たず、seed から作り直す
+    """
+
+    items: list[str]
+    allow_duplicates: bool
+    seed: int
+    card_size: int
+    cell_size: int
+    num_cards: int
+
+    @functools.cached_property
+    def cards(self) -> list[list[int]]:
+        return BingoData(
+            title='',
+            items=self.items,
+            allow_duplicates=self.allow_duplicates,
+            seed=self.seed,
+        ).sample_cards(self.num_cards, self.cell_size)
+
+    def describe_card(self, card_i: int) -> str:
+        """カードの番号を、印刷されたページと位置で表す"""
+        page_i, pos = divmod(card_i, self.card_size**2)
+        card_xi, card_yi = divmod(pos, self.card_size)
+        # card_yi はページの下から数えている
+        row = self.card_size - card_yi
+        return f'{page_i + 1}ページ {row}行{card_xi + 1}列'
+
+    @staticmethod
+    def path_for(output_path: str | pathlib.Path) -> pathlib.Path:
+        """PDF の隣に置くカードの組のファイルのパス"""
+        output_path = pathlib.Path(output_path)
+        return output_path.with_name(output_path.stem + CARD_SET_SUFFIX)
+
+    def save(self, path: str | pathlib.Path) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(dataclasses.asdict(self), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path) -> 'CardSet':
+        with open(path, encoding='utf-8') as f:
+            return cls(**json.load(f))
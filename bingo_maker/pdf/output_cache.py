@@ -0,0 +1,164 @@
+"""
+描画した PDF をディスクにキャッシュする
+
+キーは中身・BingoLayoutSpec・描画の設定・フォントファイルのハッシュ・seed・
+描画処理のバージョンから作るので、同じジョブなら出力先の名前が違っても
+使い回せる。使い回すときは出力先にハードリンク (できなければコピー) を作る
+合計サイズが上限を超えたら、最後に使ったのが古いものから削除する
+"""
+
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+from typing import Any
+import warnings
+
+import reportlab
+
+from bingo_maker import utils
+
+from . import fonts
+from . import models
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def job_key(
+    renderer_version: int,
+    num_pages: int,
+    data: models.BingoData,
+    spec: models.BingoLayoutSpec,
+    options: Any,
+) -> str:
+    """出力を決めるすべての値のハッシュ
+
+    options は出力に影響する描画の設定 (dataclass)
+    """
+    payload = {
+        'renderer_version': renderer_version,
+        'reportlab_version': reportlab.Version,
+        'num_pages': num_pages,
+        'data': dataclasses.asdict(data),
+        'spec': dataclasses.asdict(spec),
+        'options': dataclasses.asdict(options),
+        'font_digest': font_digest(spec.font_type),
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+
+
+def font_digest(font_type: str) -> str:
+    file_path = fonts.get_font_path(font_type)
+    if file_path is None:
+        # 標準フォントは reportlab のバージョンで決まる
+        return f'builtin:{font_type}'
+    stat = file_path.stat()
+    return _file_digest(
+        str(file_path.resolve()), stat.st_size, stat.st_mtime_ns
+    )
+
+
+@functools.cache
+def _file_digest(path: str, size: int, mtime_ns: int) -> str:
+    # サイズと更新日時が同じ間は、読み直さない
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+class OutputCache:
+    """ハードリンクした出力先をその場で書き換えると、キャッシュも変わる
+
+    render_bingo_pdf は上書きする前にリンクを外す
+    キャッシュのディレクトリを作れなければ、警告してキャッシュなしで動く
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        cache_dir: str | pathlib.Path | None = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.cache_dir: pathlib.Path | None
+        try:
+            self.cache_dir = (
+                utils.resolve_cache_dir('outputs')
+                if cache_dir is None
+                else pathlib.Path(cache_dir)
+            )
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            # キャッシュを使えなくても描画はできる
+            warnings.warn(
+                f'出力のキャッシュを使えません：{e}',
+                RuntimeWarning,
+                stacklevel=2,
+            )
+            self.cache_dir = None
+
+    def fetch(self, key: str, output_path: str | pathlib.Path) -> bool:
+        """キャッシュがあれば output_path に置いて True を返す"""
+        if self.cache_dir is None:
+            return False
+        entry_path = self._entry_path(key)
+        output_path = pathlib.Path(output_path)
+        try:
+            # 更新日時を最後に使った時刻として使う
+            os.utime(entry_path)
+            output_path.unlink(missing_ok=True)
+            _link_or_copy(entry_path, output_path)
+        except FileNotFoundError:
+            # 別のプロセスが削除した場合も含む
+            return False
+        return True
+
+    def store(self, key: str, output_path: str | pathlib.Path) -> None:
+        if self.cache_dir is None:
+            return
+        entry_path = self._entry_path(key)
+        try:
+            if pathlib.Path(output_path).stat().st_size > self.max_bytes:
+                return
+            # 他のプロセスが書きかけのファイルを使わないように、置き換える
+            with tempfile.TemporaryDirectory(dir=self.cache_dir) as tmp_dir:
+                tmp_path = pathlib.Path(tmp_dir) / entry_path.name
+                _link_or_copy(pathlib.Path(output_path), tmp_path)
+                os.replace(tmp_path, entry_path)
+            self._evict()
+        except OSError:
+            # キャッシュに書き込めなくても出力はできている
+            pass
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        return self.cache_dir / f'{key}.pdf'
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.cache_dir.glob('*.pdf'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def _link_or_copy(src: pathlib.Path, dst: pathlib.Path) -> None:
+    try:
+        os.link(src, dst)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        # 別のドライブや、ハードリンクに対応していないファイルシステム
+        shutil.copyfile(src, dst)
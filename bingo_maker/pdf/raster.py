@@ -0,0 +1,327 @@
+"""
+カードを 1 枚ずつ画像 (PNG / WebP) にする
+
+座標は PDF と同じ LayoutPlan / PreparedItems で計算し、フォントも同じファイルを
+Pillow で使う。カードは複数プロセスで分担して描画する
+"""
+
+from collections.abc import Callable
+from collections.abc import Iterator
+from concurrent import futures
+import dataclasses
+import functools
+import io
+import pathlib
+import threading
+import zipfile
+
+from PIL import Image
+from PIL import ImageDraw
+from PIL import ImageFont
+
+from . import card_ids
+from . import fonts
+from . import models
+from . import renderer
+
+# 形式 -> (Pillow の形式名, 拡張子)
+IMAGE_FORMATS = {'png': ('PNG', '.png'), 'webp': ('WEBP', '.webp')}
+# 線と文字だけの画像なので、WebP は可逆圧縮の速い設定の方が小さくなる
+_SAVE_OPTIONS = {'png': {}, 'webp': {'lossless': True, 'quality': 0}}
+DEFAULT_DPI = 150
+# 1 つのジョブで描画するカードの数
+CARDS_PER_JOB = 32
+
+# (ファイル名, 画像のバイト列)
+_EncodedImage = tuple[str, bytes]
+
+
+@dataclasses.dataclass(frozen=True)
+class _ImageOptions:
+    image_format: str = 'png'
+    dpi: float = DEFAULT_DPI
+    auto_fit: bool = False
+
+
+def render_bingo_images(
+    num_cards: int,
+    data: models.BingoData,
+    spec: models.BingoLayoutSpec,
+    output_path: str | pathlib.Path,
+    image_format: str = 'png',
+    dpi: float = DEFAULT_DPI,
+    auto_fit: bool = False,
+    workers: int = 1,
+    archive: bool = False,
+    progress: Callable[[int, int], None] | None = None,
+    cancel_event: threading.Event | None = None,
+) -> None:
+    """カードごとに画像を作り、output_path のディレクトリに書き出す
+
+    archive=True なら小さなファイルを大量に作らずに、output_path に
+    1 つの ZIP ファイルとして書き出す
+    画像のファイル名は '{通し番号}_{カードの ID}.{拡張子}' で、ID は PDF と同じ
+    progress には (描画済みのカードの数, 全カードの数) が渡される
+    cancel_event がセットされると RenderCancelled を送出する
+    """
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f'対応していない画像の形式です：{image_format}')
+    if data.seed is None:
+        data = dataclasses.replace(data, seed=models.new_seed())
+    fonts.ensure_registered(spec.font_type)
+    if fonts.get_font_path(spec.font_type) is None:
+        # Pillow で描くには、フォントファイルが必要
+        raise ValueError(
+            f'画像の書き出しには使えないフォントです：{spec.font_type}'
+        )
+    options = _ImageOptions(
+        image_format=image_format, dpi=dpi, auto_fit=auto_fit
+    )
+    output_path = pathlib.Path(output_path)
+
+    if archive:
+        # 画像はすでに圧縮されているので、ZIP では圧縮しない
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_STORED) as f:
+            for images in _render_jobs(
+                num_cards, data, spec, options, workers, progress, cancel_event
+            ):
+                for name, image_bytes in images:
+                    f.writestr(name, image_bytes)
+        return
+
+    output_path.mkdir(parents=True, exist_ok=True)
+    for images in _render_jobs(
+        num_cards, data, spec, options, workers, progress, cancel_event
+    ):
+        for name, image_bytes in images:
+            (output_path / name).write_bytes(image_bytes)
+
+
+def _render_jobs(
+    num_cards: int,
+    data: models.BingoData,
+    spec: models.BingoLayoutSpec,
+    options: _ImageOptions,
+    workers: int,
+    progress: Callable[[int, int], None] | None,
+    cancel_event: threading.Event | None,
+) -> Iterator[list[_EncodedImage]]:
+    """カードの番号順に、ジョブごとの画像を返す"""
+    jobs = [
+        (first_card, min(CARDS_PER_JOB, num_cards - first_card))
+        for first_card in range(0, num_cards, CARDS_PER_JOB)
+    ]
+
+    done = 0
+    if workers > 1 and len(jobs) > 1:
+        # 中身やレイアウトはプロセスごとに 1 回だけ受け取って計算し、
+        # ジョブではカードの範囲だけを渡す
+        executor = futures.ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)),
+            initializer=_init_worker,
+            initargs=(
+                fonts.get_font_path(spec.font_type),
+                data,
+                spec,
+                options,
+            ),
+        )
+        pending = [executor.submit(_render_in_worker, *job) for job in jobs]
+        try:
+            for job in pending:
+                # 次のジョブを待つ間もキャンセルを確かめる
+                while not futures.wait([job], timeout=0.1).done:
+                    _check_cancelled(cancel_event)
+                images = job.result()
+                done += len(images)
+                _report(done, num_cards, progress, cancel_event)
+                yield images
+        except BaseException:
+            # 途中で止めるとき (キャンセルや書き出しの失敗) は、実行中の
+            # ジョブも待たずにプロセスごと終了する
+            renderer._terminate_executor(executor)
+            raise
+        executor.shutdown()
+        return
+
+    card_renderer = _CardRenderer.build(data, spec, options)
+    for job in jobs:
+        images = card_renderer.render(*job)
+        done += len(images)
+        _report(done, num_cards, progress, cancel_event)
+        yield images
+
+
+def _report(
+    done: int,
+    total: int,
+    progress: Callable[[int, int], None] | None,
+    cancel_event: threading.Event | None,
+) -> None:
+    if progress is not None:
+        progress(done, total)
+    _check_cancelled(cancel_event)
+
+
+def _check_cancelled(cancel_event: threading.Event | None) -> None:
+    if cancel_event is not None and cancel_event.is_set():
+        raise renderer.RenderCancelled
+
+
+@dataclasses.dataclass(frozen=True)
+class _CardRenderer:
+    """ジョブによらないもの (レイアウトやフォント) をまとめて持つ"""
+
+    data: models.BingoData
+    spec: models.BingoLayoutSpec
+    options: _ImageOptions
+    plan: renderer.LayoutPlan
+    # data.items と同じ順のレイアウト
+    layouts: list[renderer.ItemLayout]
+    font_path: str
+
+    @classmethod
+    def build(
+        cls,
+        data: models.BingoData,
+        spec: models.BingoLayoutSpec,
+        options: _ImageOptions,
+    ) -> '_CardRenderer':
+        prepared = renderer.PreparedItems(data.items)
+        layouts_by_item = (
+            prepared.fitted_layouts(
+                spec.font_type,
+                spec.cell_w * renderer.FIT_RATIO,
+                spec.cell_h * renderer.FIT_RATIO,
+            )
+            if options.auto_fit
+            else prepared.layouts(spec.font_type, spec.item_font_size)
+        )
+        return cls(
+            data=data,
+            spec=spec,
+            options=options,
+            plan=renderer.LayoutPlan.from_spec(spec),
+            layouts=[layouts_by_item[item] for item in data.items],
+            font_path=str(fonts.get_font_path(spec.font_type)),
+        )
+
+    def render(self, first_card: int, num_cards: int) -> list[_EncodedImage]:
+        pil_format, suffix = IMAGE_FORMATS[self.options.image_format]
+        save_options = _SAVE_OPTIONS[self.options.image_format]
+
+        images = []
+        for card_i, card in enumerate(
+            self.data.sample_cards(
+                num_cards, self.spec.cell_size, start=first_card
+            ),
+            start=first_card,
+        ):
+            card_id = card_ids.encode_card_id(self.data.seed, card_i)
+            image = _draw_card(
+                self.data,
+                self.spec,
+                self.plan,
+                self.layouts,
+                card,
+                card_id,
+                self.font_path,
+                self.options.dpi,
+            )
+            buffer = io.BytesIO()
+            image.save(buffer, pil_format, **save_options)
+            images.append(
+                (f'{card_i + 1:06d}_{card_id}{suffix}', buffer.getvalue())
+            )
+        return images
+
+
+# 子プロセスで _init_worker が作る
+_worker_renderer: _CardRenderer | None = None
+
+
+def _init_worker(
+    font_path: pathlib.Path,
+    data: models.BingoData,
+    spec: models.BingoLayoutSpec,
+    options: _ImageOptions,
+) -> None:
+    global _worker_renderer
+
+    fonts.init_worker(font_paths=[font_path])
+    _worker_renderer = _CardRenderer.build(data, spec, options)
+
+
+def _render_in_worker(first_card: int, num_cards: int) -> list[_EncodedImage]:
+    return _worker_renderer.render(first_card, num_cards)
+
+
+def _draw_card(
+    data: models.BingoData,
+    spec: models.BingoLayoutSpec,
+    plan: renderer.LayoutPlan,
+    layouts: list[renderer.ItemLayout],
+    card: list[int],
+    card_id: str,
+    font_path: str,
+    dpi: float,
+) -> Image.Image:
+    """左下のカード (原点が (0, 0)) の座標で 1 枚を描く"""
+    scale = dpi / 72
+
+    def to_image(x: float, y: float) -> tuple[float, float]:
+        return x * scale, (spec.card_h - y) * scale
+
+    # 白黒だけなのでグレースケールにして、ファイルを小さくする
+    image = Image.new(
+        'L', (round(spec.card_w * scale), round(spec.card_h * scale)), 255
+    )
+    draw = ImageDraw.Draw(image)
+    line_width = max(1, round(scale))
+
+    x, y, w, h = plan.grid_rects[0]
+    draw.rectangle(
+        (*to_image(x, y + h), *to_image(x + w, y)), outline=0, width=line_width
+    )
+    for x1, y1, x2, y2 in plan.grid_lines[0]:
+        draw.line(
+            (*to_image(x1, y1), *to_image(x2, y2)), fill=0, width=line_width
+        )
+
+    # anchor の 's' はベースラインで、PDF と同じ基準になる
+    draw.text(
+        to_image(*plan.title_positions[0]),
+        data.title,
+        fill=0,
+        font=_image_font(font_path, spec.title_font_size * scale),
+        anchor='ms',
+    )
+    draw.text(
+        to_image(*plan.card_id_positions[0]),
+        card_id,
+        fill=0,
+        font=_image_font(
+            font_path,
+            spec.card_id_font_size * scale,
+        ),
+        anchor='rs',
+    )
+    for item_i, (cx, cy) in zip(card, plan.cell_centers[0]):
+        layout = layouts[item_i]
+        font = _image_font(font_path, layout.font_size * scale)
+        for line, width, y_offset in zip(
+            layout.lines, layout.widths, layout.y_offsets
+        ):
+            draw.text(
+                to_image(cx - width / 2, cy + y_offset),
+                line,
+                fill=0,
+                font=font,
+                anchor='ls',
+            )
+    return image
+
+
+@functools.cache
+def _image_font(font_path: str, size: float) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(font_path, size)
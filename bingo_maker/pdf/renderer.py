@@ -1,12 +1,50 @@
+from collections.abc import Callable
 from collections.abc import Generator
+from concurrent import futures
+import contextlib
+import cProfile
+import dataclasses
+import math
 import pathlib
 import re
+import tempfile
+import threading
+import time
+from typing import Any
 
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase import ttfonts
 from reportlab.pdfgen import canvas
 
+from . import card_ids
+from . import checkpoint
+from . import fonts
+from . import instrumentation
 from . import models
+from . import output_cache
+
+# 出力が変わる変更をしたら上げる (出力のキャッシュのキーに使う)
+RENDERER_VERSION = 3
+
+CARD_TEMPLATE_NAME = 'bingo_card'
+# auto_fit で中身がマスに占める割合の上限
+FIT_RATIO = 0.9
+# auto_fit で選ぶフォントの大きさの刻み (UI のスピンボックスと同じ)
+FIT_FONT_SIZE_STEP = 0.5
+
+# resume=True で chunk_pages を省略したときの、1 つの範囲のページ数
+RESUME_CHUNK_PAGES = 100
+# シャードで埋め込む文字を集めるときに、一度に抽選するカードの数
+GLYPH_SAMPLE_CARDS = 10000
+
+# rl_config を一時的に書き換える間、他のスレッドの保存と重ならないようにする
+_binary_streams_lock = threading.Lock()
+
+
+class RenderCancelled(Exception):
+    pass
 
 
 class TextBlockAligner:
@@ -17,88 +55,738 @@ class TextBlockAligner:
         self.ascent = pdfmetrics.getAscent(font_type) * font_size / 1000
         self.descent = abs(pdfmetrics.getDescent(font_type) * font_size / 1000)
 
+    def compute_block_height(self, line_count: int) -> float:
+        return self.ascent + (line_count - 1) * self.leading + self.descent
+
     def compute_line_y_positions(
         self, line_count: int, center_y: float
     ) -> Generator[float]:
-        block_h = self.ascent + (line_count - 1) * self.leading + self.descent
+        block_h = self.compute_block_height(line_count)
         baseline = center_y + block_h / 2.0 - self.ascent
         for i in range(line_count):
             yield baseline - i * self.leading
 
 
+@dataclasses.dataclass(frozen=True)
+class ItemLayout:
+    lines: tuple[str, ...]
+    font_size: float
+    widths: tuple[float, ...]
+    # マスの中心から見た各行のベースラインの位置
+    y_offsets: tuple[float, ...]
+
+
+_ItemWidths = dict[str, tuple[float, ...]]
+
+
+class PreparedItems:
+    """中身ごとの行分割と、フォントと大きさごとの各行の幅を保持する"""
+
+    def __init__(self, items: list[str]) -> None:
+        self.lines = {item: tuple(re.split(r'[\\/]+', item)) for item in items}
+        self._widths: dict[tuple[str, float], _ItemWidths] = {}
+        self._layouts: dict[tuple[Any, ...], dict[str, ItemLayout]] = {}
+        self._y_offsets: dict[tuple[str, float], list[tuple[float, ...]]] = {}
+
+    def widths(self, font_type: str, font_size: float) -> _ItemWidths:
+        key = (font_type, font_size)
+        if key not in self._widths:
+            self._widths[key] = {
+                item: tuple(
+                    pdfmetrics.stringWidth(line, font_type, font_size)
+                    for line in lines
+                )
+                for item, lines in self.lines.items()
+            }
+        return self._widths[key]
+
+    def layouts(
+        self, font_type: str, font_size: float
+    ) -> dict[str, ItemLayout]:
+        key = (font_type, font_size)
+        if key not in self._layouts:
+            widths = self.widths(font_type, font_size)
+            self._layouts[key] = {
+                item: self._layout(item, font_type, font_size, widths[item])
+                for item in self.lines
+            }
+        return self._layouts[key]
+
+    def fitted_layouts(
+        self, font_type: str, box_w: float, box_h: float
+    ) -> dict[str, ItemLayout]:
+        """中身ごとに box_w x box_h に収まる最大の大きさで配置する"""
+        key = (font_type, box_w, box_h)
+        if key not in self._layouts:
+            # 幅も高さもフォントの大きさに比例するので、大きさ 1 で測って割り戻す
+            unit_widths = self.widths(font_type, 1.0)
+            unit_aligner = TextBlockAligner(1.0, font_type)
+            self._layouts[key] = {}
+            for item, lines in self.lines.items():
+                font_size = min(
+                    box_w / max(max(unit_widths[item]), 1e-9),
+                    box_h / unit_aligner.compute_block_height(len(lines)),
+                )
+                font_size = max(
+                    FIT_FONT_SIZE_STEP,
+                    math.floor(font_size / FIT_FONT_SIZE_STEP)
+                    * FIT_FONT_SIZE_STEP,
+                )
+                self._layouts[key][item] = self._layout(
+                    item,
+                    font_type,
+                    font_size,
+                    tuple(w * font_size for w in unit_widths[item]),
+                )
+        return self._layouts[key]
+
+    def _layout(
+        self,
+        item: str,
+        font_type: str,
+        font_size: float,
+        widths: tuple[float, ...],
+    ) -> ItemLayout:
+        lines = self.lines[item]
+        return ItemLayout(
+            lines=lines,
+            font_size=font_size,
+            widths=widths,
+            y_offsets=self.y_offsets(font_type, font_size, len(lines)),
+        )
+
+    def y_offsets(
+        self, font_type: str, font_size: float, line_count: int
+    ) -> tuple[float, ...]:
+        """マスの中心から見た各行のベースラインの位置 (行数ごとに一度だけ計算)"""
+        key = (font_type, font_size)
+        if key not in self._y_offsets:
+            aligner = TextBlockAligner(font_size, font_type)
+            max_lines = max(map(len, self.lines.values()), default=0)
+            self._y_offsets[key] = [
+                tuple(aligner.compute_line_y_positions(n, 0))
+                for n in range(max_lines + 1)
+            ]
+        return self._y_offsets[key][line_count]
+
+
+@dataclasses.dataclass(frozen=True)
+class LayoutPlan:
+    """BingoLayoutSpec から一度だけ計算する座標 (描画時は参照するだけ)
+
+    いずれもページ上の絶対座標で、カードの番号 card_xi * card_size + card_yi
+    で引く。cell_centers[カード][マス] のマスの番号は xi * cell_size + yi
+    """
+
+    card_origins: tuple[tuple[float, float], ...]
+    title_positions: tuple[tuple[float, float], ...]
+    card_id_positions: tuple[tuple[float, float], ...]
+    grid_rects: tuple[tuple[float, float, float, float], ...]
+    grid_lines: tuple[tuple[tuple[float, float, float, float], ...], ...]
+    cell_centers: tuple[tuple[tuple[float, float], ...], ...]
+
+    @classmethod
+    def from_spec(cls, spec: models.BingoLayoutSpec) -> 'LayoutPlan':
+        card_origins = tuple(
+            (spec.card_w * card_xi, spec.card_h * card_yi)
+            for card_xi in range(spec.card_size)
+            for card_yi in range(spec.card_size)
+        )
+        # タイトルと ID のベースライン。ID はマスの下の行に右寄せで書く
+        title_y = spec.card_h - spec.margin_h - spec.title_font_size
+        card_id_y = spec.margin_h + spec.card_id_font_size * 0.4
+        grid_x = spec.margin_w
+        grid_y = spec.grid_y
+        grid_lines = []
+        for i in range(spec.cell_size + 1):
+            x = grid_x + i * spec.cell_w
+            grid_lines.append((x, grid_y, x, grid_y + spec.grid_h))
+            y = grid_y + i * spec.cell_h
+            grid_lines.append((grid_x, y, grid_x + spec.grid_w, y))
+        cell_centers = [
+            (
+                grid_x + spec.cell_w / 2 + xi * spec.cell_w,
+                grid_y + spec.cell_h / 2 + yi * spec.cell_h,
+            )
+            for xi in range(spec.cell_size)
+            for yi in range(spec.cell_size)
+        ]
+        return cls(
+            card_origins=card_origins,
+            title_positions=tuple(
+                (ox + spec.card_w / 2, oy + title_y) for ox, oy in card_origins
+            ),
+            card_id_positions=tuple(
+                (ox + grid_x + spec.grid_w, oy + card_id_y)
+                for ox, oy in card_origins
+            ),
+            grid_rects=tuple(
+                (ox + grid_x, oy + grid_y, spec.grid_w, spec.grid_h)
+                for ox, oy in card_origins
+            ),
+            grid_lines=tuple(
+                tuple(
+                    (ox + x1, oy + y1, ox + x2, oy + y2)
+                    for x1, y1, x2, y2 in grid_lines
+                )
+                for ox, oy in card_origins
+            ),
+            cell_centers=tuple(
+                tuple((ox + x, oy + y) for x, y in cell_centers)
+                for ox, oy in card_origins
+            ),
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class _RenderOptions:
+    use_template: bool = False
+    auto_fit: bool = False
+    optimize_size: bool = False
+
+
 def render_bingo_pdf(
     num_pages: int,
     data: models.BingoData,
     spec: models.BingoLayoutSpec,
     output_path: str | pathlib.Path,
-) -> None:
-    c = canvas.Canvas(str(output_path), pagesize=(spec.page_w, spec.page_h))
+    use_template: bool = False,
+    auto_fit: bool = False,
+    workers: int = 1,
+    chunk_pages: int | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    cancel_event: threading.Event | None = None,
+    metrics: instrumentation.RenderMetrics | None = None,
+    profile: bool = False,
+    optimize_size: bool = False,
+    cache: output_cache.OutputCache | None = None,
+    resume: bool = False,
+) -> int:
+    """PDF を描画し、カードに使った seed を返す
+
+    use_template=True なら枠線とタイトルを Form XObject として使い回す
+
+    auto_fit=True なら中身ごとにマスに収まる最大の大きさで描画する
+
+    workers > 1 ならページを分割して複数プロセスで描画し、最後に結合する
+    chunk_pages を指定すると、そのページ数ごとにディスクへ書き出して
+    メモリ使用量を一定に保つ
+    progress には (描画済みのページ数, 全ページ数) が渡される
+    cancel_event がセットされると RenderCancelled を送出し、何も出力しない
+    各カードには data.seed と番号から作った ID を印刷する
+    (data.seed が None ならここで決める)
+    metrics を渡すと段階ごとの所要時間とカウンタを集計する
+    profile=True なら cProfile の結果を出力先と同じ場所に .prof で保存する
+    optimize_size=True ならファイルサイズを優先する (ストリームを圧縮して
+    バイナリのまま書き出し、使った文字のグリフだけを埋め込む)
+    workers や chunk_pages で分けて描画した場合は、どの範囲にも同じグリフの
+    フォントを埋め込み、結合時に 1 つにまとめる
+    cache を渡すと、同じ内容の PDF を以前に描画していればそれを使う
+    data.seed が None なら毎回違う内容になるので、cache は使わない
+    (キャッシュを使うかどうかはここだけで決めるので、呼び出し側は seed を
+    決めずに data.seed=None のまま渡す)
+    resume=True なら chunk_pages (省略時は RESUME_CHUNK_PAGES) ごとに描画済みの
+    範囲を出力先の隣に記録し、中断後に同じ引数で呼ぶと続きから描画する
+    出力は中断しなかった場合と同じになる (data.seed が None なら前回の seed を使う)
+    """
+    args = (
+        num_pages,
+        data,
+        spec,
+        output_path,
+        _RenderOptions(
+            use_template=use_template,
+            auto_fit=auto_fit,
+            optimize_size=optimize_size,
+        ),
+        workers,
+        chunk_pages,
+        _ProgressTracker(num_pages, progress, cancel_event),
+        metrics or instrumentation.RenderMetrics(),
+        cache,
+        resume,
+    )
+    if not profile:
+        return _render(*args)
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(_render, *args)
+    finally:
+        profiler.dump_stats(pathlib.Path(output_path).with_suffix('.prof'))
+
+
+def _render(
+    num_pages: int,
+    data: models.BingoData,
+    spec: models.BingoLayoutSpec,
+    output_path: str | pathlib.Path,
+    options: _RenderOptions,
+    workers: int,
+    chunk_pages: int | None,
+    tracker: '_ProgressTracker',
+    metrics: instrumentation.RenderMetrics,
+    cache: output_cache.OutputCache | None,
+    resume: bool,
+) -> int:
+    start = time.perf_counter()
+    resume_from = None
+    if resume:
+        resume_from = checkpoint.Checkpoint(
+            checkpoint.checkpoint_dir(output_path)
+        )
+        chunk_pages = chunk_pages or RESUME_CHUNK_PAGES
+    if data.seed is None:
+        cache = None
+        seed = None if resume_from is None else resume_from.seed
+        data = dataclasses.replace(
+            data, seed=models.new_seed() if seed is None else seed
+        )
+    tracker.check()
+    with metrics.span('register_font'):
+        fonts.ensure_registered(spec.font_type)
+
+    cache_key = None
+    if cache is not None:
+        with metrics.span('cache'):
+            cache_key = output_cache.job_key(
+                RENDERER_VERSION, num_pages, data, spec, options
+            )
+            hit = cache.fetch(cache_key, output_path)
+        metrics.count('cache_hits' if hit else 'cache_misses')
+        if hit:
+            tracker.advance(num_pages)
+            metrics.emit(
+                'render', **metrics.summary(time.perf_counter() - start)
+            )
+            return data.seed
+    # 出力先がキャッシュのハードリンクなら、上書きでキャッシュを壊さないように外す
+    output_path = pathlib.Path(output_path)
+    if output_path.exists() and output_path.stat().st_nlink > 1:
+        output_path.unlink()
+
+    if chunk_pages is not None:
+        shard_sizes = [
+            min(chunk_pages, num_pages - i)
+            for i in range(0, num_pages, chunk_pages)
+        ]
+    else:
+        num_shards = max(1, min(workers, num_pages))
+        shard_sizes = [
+            num_pages // num_shards + (i < num_pages % num_shards)
+            for i in range(num_shards)
+        ]
+
+    if len(shard_sizes) == 1 and resume_from is None:
+        _render_pages(
+            num_pages,
+            data,
+            spec,
+            output_path,
+            options,
+            0,
+            tracker.advance,
+            metrics,
+        )
+    else:
+        _render_shards(
+            shard_sizes,
+            data,
+            spec,
+            output_path,
+            options,
+            workers,
+            tracker,
+            metrics,
+            resume_from,
+        )
+    if cache_key is not None:
+        with metrics.span('cache'):
+            cache.store(cache_key, output_path)
+    metrics.emit('render', **metrics.summary(time.perf_counter() - start))
+    return data.seed
+
+
+class _ProgressTracker:
+    def __init__(
+        self,
+        num_pages: int,
+        progress: Callable[[int, int], None] | None,
+        cancel_event: threading.Event | None,
+    ) -> None:
+        self.num_pages = num_pages
+        self.done_pages = 0
+        self._progress = progress
+        self._cancel_event = cancel_event
+
+    def check(self) -> None:
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            raise RenderCancelled
+
+    def advance(self, pages: int = 1) -> None:
+        self.done_pages += pages
+        if self._progress is not None:
+            self._progress(self.done_pages, self.num_pages)
+        self.check()
+
+
+def _render_pages(
+    num_pages: int,
+    data: models.BingoData,
+    spec: models.BingoLayoutSpec,
+    output_path: str | pathlib.Path,
+    options: _RenderOptions,
+    first_card: int = 0,
+    on_page_done: Callable[[], None] | None = None,
+    metrics: instrumentation.RenderMetrics | None = None,
+    glyph_chars: str | None = None,
+) -> instrumentation.RenderMetrics:
+    """first_card 番目のカードから num_pages ページ分を描画する
+
+    別プロセスから結果を受け取れるように、集計した metrics を返す
+    glyph_chars を渡すと、そのグリフを先に割り当て、結合するほかのシャードと
+    同じサブセットを埋め込む
+    """
+    if metrics is None:
+        metrics = instrumentation.RenderMetrics()
+    if options.optimize_size:
+        spec = dataclasses.replace(
+            spec, font_type=fonts.ensure_subsetting_font(spec.font_type)
+        )
+    c = canvas.Canvas(
+        str(output_path),
+        pagesize=(spec.page_w, spec.page_h),
+        pageCompression=1 if options.optimize_size else None,
+    )
+    if glyph_chars is not None:
+        _assign_glyphs(c, spec, glyph_chars)
+    plan = LayoutPlan.from_spec(spec)
 
-    for _ in range(num_pages):
+    if options.use_template:
+        with metrics.span('template'):
+            _define_card_template(c, data, spec, plan)
+
+    with metrics.span('layout'):
+        prepared = PreparedItems(data.items)
+        layouts_by_item = (
+            prepared.fitted_layouts(
+                spec.font_type,
+                spec.cell_w * FIT_RATIO,
+                spec.cell_h * FIT_RATIO,
+            )
+            if options.auto_fit
+            else prepared.layouts(spec.font_type, spec.item_font_size)
+        )
+        layouts = [layouts_by_item[item] for item in data.items]
+
+    cards_per_page = spec.card_size**2
+    with metrics.span('sample'):
+        cards = data.sample_cards(
+            num_pages * cards_per_page, spec.cell_size, start=first_card
+        )
+    for page_i in range(num_pages):
+        page_start = time.perf_counter()
         c.setStrokeColor(colors.black)
         c.setLineWidth(1)
-        _draw_bingo_cards(c, data, spec)
+        _draw_bingo_cards(
+            c,
+            data,
+            spec,
+            plan,
+            layouts,
+            cards[page_i * cards_per_page : (page_i + 1) * cards_per_page],
+            first_card + page_i * cards_per_page,
+            options.use_template,
+        )
         c.showPage()
+        page_seconds = time.perf_counter() - page_start
+        metrics.spans['draw'] += page_seconds
+        metrics.count('pages')
+        metrics.count('cards', cards_per_page)
+        metrics.count('cells', cards_per_page * spec.cell_size**2)
+        metrics.emit(
+            'page',
+            page=first_card // cards_per_page + page_i + 1,
+            seconds=page_seconds,
+        )
+        if on_page_done is not None:
+            on_page_done()
 
-    c.save()
+    with metrics.span('save'):
+        if options.optimize_size:
+            with _binary_streams():
+                c.save()
+        else:
+            c.save()
+    return metrics
 
 
-def _draw_bingo_cards(
-    c: canvas.Canvas, data: models.BingoData, spec: models.BingoLayoutSpec
+def _assign_glyphs(
+    c: canvas.Canvas, spec: models.BingoLayoutSpec, chars: str
 ) -> None:
-    for card_xi in range(spec.card_size):
-        origin_x = spec.card_w * card_xi
-        for card_yi in range(spec.card_size):
-            origin_y = spec.card_h * card_yi
-            _draw_bingo_card(c, data, spec, origin_x, origin_y)
+    """埋め込むグリフを、決まった順で割り当てる
+
+    reportlab は出てきた順に割り当てるので、順番を固定してどのシャードも
+    同じサブセットにし、結合時にまとめられるようにする
+    """
+    font = pdfmetrics.getFont(spec.font_type)
+    if not isinstance(font, ttfonts.TTFont):
+        # 標準フォントは埋め込まない
+        return
+    font.splitString(chars, c._doc)
+
+
+def _printed_chars(
+    num_cards: int, data: models.BingoData, spec: models.BingoLayoutSpec
+) -> str:
+    """ジョブのカードに印刷する文字 (タイトル・ID・抽選された中身) を並べる
+
+    中身はすべてのカードを抽選し直して集める (全部使われたら打ち切る)
+    """
+    used: set[int] = set()
+    for first_card in range(0, num_cards, GLYPH_SAMPLE_CARDS):
+        for card in data.sample_cards(
+            min(GLYPH_SAMPLE_CARDS, num_cards - first_card),
+            spec.cell_size,
+            start=first_card,
+        ):
+            used.update(card)
+        if len(used) == len(data.items):
+            break
+    chars = set(data.title).union(
+        card_ids.ALPHABET, '-', *(data.items[i] for i in used)
+    )
+    return ''.join(sorted(chars))
+
+
+def _render_shards(
+    shard_sizes: list[int],
+    data: models.BingoData,
+    spec: models.BingoLayoutSpec,
+    output_path: str | pathlib.Path,
+    options: _RenderOptions,
+    workers: int,
+    tracker: _ProgressTracker,
+    metrics: instrumentation.RenderMetrics,
+    resume_from: checkpoint.Checkpoint | None = None,
+) -> None:
+    """resume_from を渡すと、記録済みの範囲を飛ばして書き終えた範囲を記録する"""
+    output_path = pathlib.Path(output_path)
+    cards_per_page = spec.card_size**2
+    first_cards = [0]
+    for size in shard_sizes[:-1]:
+        first_cards.append(first_cards[-1] + size * cards_per_page)
+
+    with contextlib.ExitStack() as stack:
+        if resume_from is None:
+            tmp_dir = stack.enter_context(
+                tempfile.TemporaryDirectory(dir=output_path.parent)
+            )
+            shard_paths = [
+                pathlib.Path(tmp_dir) / f'{i:05d}.pdf'
+                for i in range(len(shard_sizes))
+            ]
+            done_shards = set()
+        else:
+            shard_paths = [
+                resume_from.chunk_path(i) for i in range(len(shard_sizes))
+            ]
+            done_shards = resume_from.start(
+                output_cache.job_key(
+                    RENDERER_VERSION, sum(shard_sizes), data, spec, options
+                ),
+                data.seed,
+                shard_sizes,
+                first_cards,
+            )
+
+        def finish(i: int) -> None:
+            if resume_from is not None:
+                resume_from.mark_done(i)
+
+        with metrics.span('glyphs'):
+            glyph_chars = _printed_chars(
+                sum(shard_sizes) * cards_per_page, data, spec
+            )
+        todo = []
+        for i, size in enumerate(shard_sizes):
+            if i in done_shards:
+                metrics.count('resumed_pages', size)
+                tracker.advance(size)
+            else:
+                todo.append(i)
+
+        if workers > 1 and todo:
+            executor = futures.ProcessPoolExecutor(
+                max_workers=min(workers, len(todo)),
+                initializer=fonts.init_worker,
+                initargs=(None, [fonts.get_font_path(spec.font_type)]),
+            )
+            pending = {
+                executor.submit(
+                    _render_pages,
+                    shard_sizes[i],
+                    data,
+                    spec,
+                    shard_paths[i],
+                    options,
+                    first_cards[i],
+                    glyph_chars=glyph_chars,
+                ): i
+                for i in todo
+            }
+            try:
+                while pending:
+                    done, _ = futures.wait(
+                        pending,
+                        timeout=0.1,
+                        return_when=futures.FIRST_COMPLETED,
+                    )
+                    for job in done:
+                        # 子プロセスでは JSON Lines は書き出さずに集計だけする
+                        metrics.merge(job.result())
+                        i = pending.pop(job)
+                        finish(i)
+                        tracker.advance(shard_sizes[i])
+                    tracker.check()
+            except BaseException:
+                _terminate_executor(executor)
+                raise
+            executor.shutdown()
+        else:
+            for i in todo:
+                _render_pages(
+                    shard_sizes[i],
+                    data,
+                    spec,
+                    shard_paths[i],
+                    options,
+                    first_cards[i],
+                    tracker.advance,
+                    metrics,
+                    glyph_chars=glyph_chars,
+                )
+                finish(i)
+
+        # pypdf の読み込みは重いので、プレビューだけなら読み込まない
+        from . import merge
 
+        # シャードごとに同じフォントを埋め込んでいるので、1 つにまとめる
+        with metrics.span('merge'):
+            merge.merge_pdf_files(shard_paths, output_path, dedupe=True)
+    if resume_from is not None:
+        resume_from.remove()
 
-def _draw_bingo_card(
+
+@contextlib.contextmanager
+def _binary_streams() -> Generator[None, None, None]:
+    """ストリームを ASCII85 にせずバイナリのまま書き出す
+
+    reportlab は保存時に rl_config を参照するので、その間だけ切り替える
+    """
+    with _binary_streams_lock:
+        use_a85 = rl_config.useA85
+        rl_config.useA85 = 0
+        try:
+            yield
+        finally:
+            rl_config.useA85 = use_a85
+
+
+def _terminate_executor(executor: futures.ProcessPoolExecutor) -> None:
+    """実行中のジョブも待たずに止める
+
+    シャードはそれぞれ 1 つのプロセスで最後まで描画されるので、cancel() では
+    止まらない。プロセスごと終了する (Python 3.14 未満には公開の方法がないので
+    _processes を使う)
+    """
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+def _define_card_template(
     c: canvas.Canvas,
     data: models.BingoData,
     spec: models.BingoLayoutSpec,
-    origin_x: float,
-    origin_y: float,
+    plan: LayoutPlan,
 ) -> None:
-    c.setFont(spec.font_type, spec.title_font_size)
-    c.drawCentredString(
-        origin_x + spec.card_w / 2,
-        origin_y + spec.card_h - spec.margin_h - spec.title_font_size,
-        data.title,
-    )
-    c.setFont(spec.font_type, spec.item_font_size)
-
-    c.rect(
-        origin_x + spec.margin_w,
-        origin_y + spec.margin_h,
-        spec.grid_w,
-        spec.grid_h,
-        fill=False,
-    )
-    for i in range(spec.cell_size + 1):
-        x = origin_x + spec.margin_w + i * spec.cell_w
-        c.line(
-            x,
-            origin_y + spec.margin_h,
-            x,
-            origin_y + spec.margin_h + spec.grid_h,
+    c.beginForm(CARD_TEMPLATE_NAME, 0, 0, spec.card_w, spec.card_h)
+    c.setStrokeColor(colors.black)
+    c.setLineWidth(1)
+    # 左下のカードの原点は (0, 0) なので、その座標をそのまま使う
+    _draw_card_frame(c, data, spec, plan, 0)
+    c.endForm()
+
+
+def _draw_bingo_cards(
+    c: canvas.Canvas,
+    data: models.BingoData,
+    spec: models.BingoLayoutSpec,
+    plan: LayoutPlan,
+    layouts: list[ItemLayout],
+    cards: list[list[int]],
+    first_card: int,
+    use_template: bool = False,
+) -> None:
+    for card_i, (origin_x, origin_y) in enumerate(plan.card_origins):
+        if use_template:
+            c.saveState()
+            c.translate(origin_x, origin_y)
+            c.doForm(CARD_TEMPLATE_NAME)
+            c.restoreState()
+        else:
+            _draw_card_frame(c, data, spec, plan, card_i)
+        c.setFont(spec.font_type, spec.card_id_font_size)
+        c.drawRightString(
+            *plan.card_id_positions[card_i],
+            card_ids.encode_card_id(data.seed, first_card + card_i),
         )
-        y = origin_y + spec.margin_h + i * spec.cell_h
-        c.line(
-            origin_x + spec.margin_w,
-            y,
-            origin_x + spec.margin_w + spec.grid_w,
-            y,
+        _draw_card_items(
+            c, spec, layouts, cards[card_i], plan.cell_centers[card_i]
         )
 
-    aligner = TextBlockAligner(spec.item_font_size, spec.font_type)
-    items = data.pick_cell_items(spec.cell_size)
-    for xi in range(spec.cell_size):
-        x = origin_x + spec.margin_w + spec.cell_w / 2 + xi * spec.cell_w
-        for yi in range(spec.cell_size):
-            y = origin_y + spec.margin_h + spec.cell_h / 2 + yi * spec.cell_h
-
-            lines = re.split(r'[\\/]+', items[xi * spec.cell_size + yi])
-            aligned_ys = aligner.compute_line_y_positions(len(lines), y)
-            for line, aligned_y in zip(lines, aligned_ys):
-                c.drawCentredString(x, aligned_y, line)
+
+def _draw_card_frame(
+    c: canvas.Canvas,
+    data: models.BingoData,
+    spec: models.BingoLayoutSpec,
+    plan: LayoutPlan,
+    card_i: int,
+) -> None:
+    c.setFont(spec.font_type, spec.title_font_size)
+    c.drawCentredString(*plan.title_positions[card_i], data.title)
+    c.rect(*plan.grid_rects[card_i], fill=False)
+    c.lines(plan.grid_lines[card_i])
+
+
+def _draw_card_items(
+    c: canvas.Canvas,
+    spec: models.BingoLayoutSpec,
+    layouts: list[ItemLayout],
+    card: list[int],
+    cell_centers: tuple[tuple[float, float], ...],
+) -> None:
+    # drawString は 1 行ごとにテキストオブジェクトを作るので、カードごとに
+    # 1 つのテキストオブジェクトにまとめ、前の行からの相対位置で書く
+    text = c.beginText()
+    cursor_x = cursor_y = 0.0
+    font_size = None
+    for item_i, (x, y) in zip(card, cell_centers):
+        layout = layouts[item_i]
+        if layout.font_size != font_size:
+            font_size = layout.font_size
+            text.setFont(spec.font_type, font_size)
+        for line, width, y_offset in zip(
+            layout.lines, layout.widths, layout.y_offsets
+        ):
+            line_x = x - width / 2
+            line_y = y + y_offset
+            # moveCursor の dy は下向きが正
+            text.moveCursor(line_x - cursor_x, cursor_y - line_y)
+            cursor_x, cursor_y = line_x, line_y
+            text.textOut(line)
+    c.drawText(text)
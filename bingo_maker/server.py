@@ -0,0 +1,445 @@
+"""
+ビンゴカードの PDF を返すローカルの HTTP サービス
+
+フォントを登録済みのプロセスを待機させておき、リクエストごとのプロセスの起動や
+フォントの読み込みを省く。PDF は一時ディレクトリのファイルに書き、そこから
+少しずつ返すので、メモリに丸ごと載せない。seed を指定したリクエストの結果は、
+パラメータのハッシュをキーにして LRU で使い回す
+
+python -m bingo_maker.server --font-dir fonts --port 8765
+
+POST /render に JSON を送ると application/pdf を返す
+  {"items": ["A", "B", ...], "seed": 1, "num_pages": 1, "card_size": 1, ...}
+GET /stats でキャッシュの状況を返す
+"""
+
+import argparse
+import collections
+from concurrent import futures
+from concurrent.futures import process
+import hashlib
+import http
+from http import server
+import json
+import multiprocessing
+import os
+import pathlib
+import shutil
+import signal
+import tempfile
+import threading
+import types
+from typing import Any, BinaryIO
+import uuid
+
+from bingo_maker.pdf import fonts
+from bingo_maker.pdf import models
+from bingo_maker.pdf import renderer
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_MB = 256
+# 1 回のリクエストで作るページ数の上限 (既定値)
+DEFAULT_MAX_PAGES = 1000
+STREAM_CHUNK_BYTES = 64 * 1024
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# 受け付けるパラメータ -> (型, 既定値)。範囲は models.LIMITS で調べる
+# 既定値が None の項目だけ null を受け付ける
+_PARAMS: dict[str, tuple[type, Any]] = {
+    'title': (str, 'ビンゴカード'),
+    'items': (list, None),
+    'allow_duplicates': (bool, False),
+    'seed': (int, None),
+    'num_pages': (int, 1),
+    'card_size': (int, 1),
+    'cell_size': (int, 5),
+    'font_type': (str, None),
+    'title_font_size': (float, 20.0),
+    'item_font_size': (float, 10.0),
+    'use_template': (bool, False),
+    'auto_fit': (bool, False),
+    'optimize_size': (bool, False),
+}
+
+
+def parse_params(
+    body: dict[str, Any], font_types: list[str]
+) -> dict[str, Any]:
+    """リクエストの JSON を検証し、既定値を補ったパラメータを返す
+
+    不正な値なら ValueError を送出する
+    """
+    unknown = body.keys() - _PARAMS.keys()
+    if unknown:
+        raise ValueError(f'不明なパラメータです：{", ".join(sorted(unknown))}')
+
+    params: dict[str, Any] = {}
+    for name, (type_, default) in _PARAMS.items():
+        allowed = (type_,) if default is not None else (type_, types.NoneType)
+        params[name] = models.check_value(
+            name, body.get(name, default), allowed
+        )
+
+    items = params['items']
+    if not items or not all(isinstance(item, str) for item in items):
+        raise ValueError('items には 1 つ以上の文字列を指定してください')
+    if params['font_type'] is None:
+        params['font_type'] = fonts.default_font_type(font_types)
+    elif params['font_type'] not in font_types:
+        raise ValueError(f'フォントが見つかりません：{params["font_type"]}')
+    return params
+
+
+def params_key(params: dict[str, Any]) -> str:
+    """パラメータのハッシュ (キャッシュのキー)"""
+    return hashlib.sha256(
+        json.dumps(
+            params, sort_keys=True, ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+    ).hexdigest()
+
+
+class ResultCache:
+    """合計 max_bytes までの PDF のファイルを、最近使った順に保持する"""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._entries: collections.OrderedDict[
+            str, tuple[pathlib.Path, int]
+        ] = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def open(self, key: str, count: bool = True) -> BinaryIO | None:
+        """キャッシュしたファイルを開いて返す
+
+        開いてから返すので、その後に追い出されても読める
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return open(entry[0], 'rb')
+
+    def put(self, key: str, path: pathlib.Path) -> None:
+        """path のファイルを引き取る (追い出したら消す)"""
+        size = path.stat().st_size
+        with self._lock:
+            if key in self._entries:
+                old_path, old_size = self._entries.pop(key)
+                self._size -= old_size
+                _remove(old_path)
+            self._entries[key] = (path, size)
+            self._size += size
+            # 入れたばかりのものは待っているリクエストが開くので残す
+            while self._size > self._max_bytes and len(self._entries) > 1:
+                _, (evicted, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                _remove(evicted)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class RenderService:
+    """待機させたプロセスで描画し、結果をキャッシュする"""
+
+    def __init__(
+        self,
+        font_dir: str,
+        workers: int,
+        cache_bytes: int,
+        max_pages: int = DEFAULT_MAX_PAGES,
+    ) -> None:
+        self.font_types = fonts.find_jp_fonts_in_dir(font_dir)
+        if not self.font_types:
+            raise ValueError(f'フォントが見つかりません：{font_dir}')
+        self.max_pages = max_pages
+        self.cache = ResultCache(cache_bytes)
+        # Windows では開いているファイルを消せないので、残ったものは終了時に消す
+        self._tmp_dir = tempfile.TemporaryDirectory(
+            prefix='bingo_server_', ignore_cleanup_errors=True
+        )
+        self._workers = workers
+        self._font_dir = font_dir
+        self._executor = self._new_executor()
+        self._executor_lock = threading.Lock()
+        # 同じパラメータの描画中のリクエストは、その結果を待つ
+        self._pending: dict[str, futures.Future[None]] = {}
+        self._pending_lock = threading.Lock()
+
+        # 全プロセスを起動し、フォントの登録と描画の初回の処理を済ませる
+        warm_up = {
+            'items': ['warm up'],
+            'seed': 0,
+            'font_type': self.font_types[0],
+        }
+        paths = [self._new_path() for _ in range(workers)]
+        for job in [
+            self._executor.submit(
+                _render_pdf, parse_params(warm_up, self.font_types), path
+            )
+            for path in paths
+        ]:
+            job.result()
+        for path in paths:
+            _remove(path)
+
+    def _new_executor(self) -> futures.ProcessPoolExecutor:
+        return futures.ProcessPoolExecutor(
+            max_workers=self._workers,
+            initializer=fonts.init_worker,
+            initargs=(
+                self._font_dir,
+                [fonts.get_font_path(ft) for ft in self.font_types],
+            ),
+        )
+
+    def _render(self, params: dict[str, Any], path: pathlib.Path) -> int:
+        executor = self._executor
+        try:
+            return executor.submit(_render_pdf, params, path).result()
+        except process.BrokenProcessPool:
+            # 1 つのプロセスが落ちると以後の描画がすべて失敗するので、
+            # 作り直してから、このリクエストは失敗にする
+            with self._executor_lock:
+                if self._executor is executor:
+                    self._executor = self._new_executor()
+                    executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def render(self, body: dict[str, Any]) -> tuple[BinaryIO, int, bool]:
+        """(開いた PDF のファイル, seed, キャッシュを使ったか) を返す
+
+        キャッシュのキーはリクエストのパラメータなので、seed を省略した
+        リクエスト (毎回違うカードになる) はキャッシュしない
+        """
+        params = parse_params(body, self.font_types)
+        if params['num_pages'] > self.max_pages:
+            raise ValueError(
+                f'num_pages は{self.max_pages}以下の値にしてください'
+            )
+        if params['seed'] is None:
+            path = self._new_path()
+            try:
+                seed = self._render(params, path)
+                return open(path, 'rb'), seed, False
+            finally:
+                # 開いたファイルは消しても読める (Windows では終了時に消す)
+                _remove(path)
+
+        key = params_key(params)
+        pdf = self.cache.open(key)
+        if pdf is not None:
+            return pdf, params['seed'], True
+
+        with self._pending_lock:
+            done = self._pending.get(key)
+            is_new = done is None
+            if is_new:
+                done = futures.Future()
+                self._pending[key] = done
+        if is_new:
+            self._render_to_cache(key, params, done)
+        done.result()
+        pdf = self.cache.open(key, count=False)
+        if pdf is None:
+            # 大きすぎて、開く前に他の結果に追い出された
+            return self.render(body)
+        return pdf, params['seed'], False
+
+    def _render_to_cache(
+        self, key: str, params: dict[str, Any], done: futures.Future[None]
+    ) -> None:
+        # キャッシュに入れてから待っているリクエストに知らせる
+        path = self._new_path()
+        try:
+            self._render(params, path)
+            self.cache.put(key, path)
+        except BaseException as e:
+            _remove(path)
+            done.set_exception(e)
+        else:
+            done.set_result(None)
+        finally:
+            with self._pending_lock:
+                self._pending.pop(key, None)
+
+    def _new_path(self) -> pathlib.Path:
+        return pathlib.Path(self._tmp_dir.name) / f'{uuid.uuid4().hex}.pdf'
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            self._executor.shutdown(cancel_futures=True)
+        self._tmp_dir.cleanup()
+
+
+def _remove(path: pathlib.Path) -> None:
+    try:
+        path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _render_pdf(params: dict[str, Any], output_path: pathlib.Path) -> int:
+    data = models.BingoData(
+        title=params['title'],
+        items=params['items'],
+        allow_duplicates=params['allow_duplicates'],
+        seed=params['seed'],
+    )
+    spec = models.BingoLayoutSpec.a4(
+        card_size=params['card_size'],
+        cell_size=params['cell_size'],
+        font_type=params['font_type'],
+        title_font_size=params['title_font_size'],
+        item_font_size=params['item_font_size'],
+    )
+    return renderer.render_bingo_pdf(
+        params['num_pages'],
+        data,
+        spec,
+        output_path,
+        use_template=params['use_template'],
+        auto_fit=params['auto_fit'],
+        optimize_size=params['optimize_size'],
+    )
+
+
+class _Handler(server.BaseHTTPRequestHandler):
+    service: RenderService
+
+    def do_GET(self) -> None:
+        if self.path != '/stats':
+            self._send_json(http.HTTPStatus.NOT_FOUND, {'error': 'not found'})
+            return
+        self._send_json(http.HTTPStatus.OK, self.service.cache.stats())
+
+    def do_POST(self) -> None:
+        if self.path != '/render':
+            self._send_json(http.HTTPStatus.NOT_FOUND, {'error': 'not found'})
+            return
+        try:
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                raise ValueError('Content-Length が正しくありません')
+            if length < 0:
+                raise ValueError('Content-Length が正しくありません')
+            if length > MAX_BODY_BYTES:
+                raise ValueError('リクエストが大きすぎます')
+            body = json.loads(self.rfile.read(length))
+            if not isinstance(body, dict):
+                raise ValueError('JSON のオブジェクトを送ってください')
+            pdf, seed, cached = self.service.render(body)
+        except ValueError as e:
+            # json.JSONDecodeError も ValueError の一種
+            self._send_json(http.HTTPStatus.BAD_REQUEST, {'error': str(e)})
+            return
+        except Exception as e:
+            # プロセスの異常終了 (BrokenProcessPool) など、サービス側の失敗
+            self._send_json(
+                http.HTTPStatus.INTERNAL_SERVER_ERROR,
+                {'error': f'{type(e).__name__}: {e}'},
+            )
+            return
+
+        with pdf:
+            self.send_response(http.HTTPStatus.OK)
+            self.send_header('Content-Type', 'application/pdf')
+            self.send_header(
+                'Content-Length', str(os.fstat(pdf.fileno()).st_size)
+            )
+            self.send_header('X-Bingo-Seed', str(seed))
+            self.send_header('X-Cache', 'HIT' if cached else 'MISS')
+            self.end_headers()
+            shutil.copyfileobj(pdf, self.wfile, STREAM_CHUNK_BYTES)
+
+    def _send_json(self, status: http.HTTPStatus, body: Any) -> None:
+        content = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # リクエストごとのログは負荷試験の邪魔になるので出さない
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='bingo_maker.server',
+        description='ビンゴカードの PDF を返すローカルの HTTP サービス',
+    )
+    parser.add_argument('--font-dir', default='fonts')
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='既定ではローカルからのみ受け付ける',
+    )
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1, help='並列数'
+    )
+    parser.add_argument(
+        '--cache-mb',
+        type=int,
+        default=DEFAULT_CACHE_MB,
+        help='キャッシュする PDF の合計サイズの上限',
+    )
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        default=DEFAULT_MAX_PAGES,
+        help='1 回のリクエストで作るページ数の上限',
+    )
+    args = parser.parse_args()
+
+    try:
+        service = RenderService(
+            args.font_dir,
+            args.workers,
+            args.cache_mb * 1024 * 1024,
+            max_pages=args.max_pages,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    _Handler.service = service
+    httpd = server.ThreadingHTTPServer((args.host, args.port), _Handler)
+    httpd.daemon_threads = True
+
+    def stop(signum: int, frame: Any) -> None:
+        # serve_forever を実行しているスレッドで shutdown を呼ぶと止まるので、
+        # 別のスレッドから呼ぶ
+        threading.Thread(target=httpd.shutdown).start()
+
+    # terminate などで終了するときも、待機させたプロセスを残さない
+    signal.signal(signal.SIGTERM, stop)
+    print(f'http://{args.host}:{httpd.server_port}', flush=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.shutdown()
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    main()
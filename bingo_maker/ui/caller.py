@@ -0,0 +1,118 @@
+import random
+import tkinter as tk
+from tkinter import ttk
+from typing import Any
+
+from bingo_maker.game import caller
+from bingo_maker.pdf import card_ids
+from bingo_maker.pdf import models
+
+
+class CallerWindow(tk.Toplevel):
+    def __init__(
+        self,
+        parent: tk.Misc,
+        card_set: models.CardSet,
+        padx: float = 4,
+        pady: float = 4,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(parent, **kwargs)
+        self.title('読み上げ')
+
+        self._card_set = card_set
+        self._caller = caller.BingoCaller(
+            card_set.cards, len(card_set.items), card_set.cell_size
+        )
+        # まだ読み上げていない中身 (リストボックスの並びと同じ)
+        self._remaining = list(range(len(card_set.items)))
+
+        self._create_widgets(padx=padx, pady=pady)
+        self._update_status()
+
+    def _create_widgets(self, padx: float, pady: float) -> None:
+        ttk.Label(self, text='中身：').grid(
+            row=0, column=0, sticky='w', padx=padx, pady=pady
+        )
+        ttk.Label(self, text='読み上げ済み：').grid(
+            row=0, column=1, sticky='w', padx=padx, pady=pady
+        )
+        ttk.Label(self, text='ビンゴ：').grid(
+            row=0, column=2, sticky='w', padx=padx, pady=pady
+        )
+
+        self._remaining_listbox = tk.Listbox(
+            self, height=20, exportselection=False
+        )
+        self._remaining_listbox.insert(tk.END, *self._card_set.items)
+        self._remaining_listbox.bind(
+            '<Double-Button-1>', lambda _: self._on_call_button_click()
+        )
+        self._remaining_listbox.grid(
+            row=1, column=0, sticky='nsew', padx=padx, pady=pady
+        )
+
+        self._called_listbox = tk.Listbox(self, height=20)
+        self._called_listbox.grid(
+            row=1, column=1, sticky='nsew', padx=padx, pady=pady
+        )
+
+        self._winners_listbox = tk.Listbox(self, height=20, width=30)
+        self._winners_listbox.grid(
+            row=1, column=2, sticky='nsew', padx=padx, pady=pady
+        )
+
+        buttons = ttk.Frame(self)
+        buttons.grid(row=2, column=0, sticky='w', padx=padx, pady=pady)
+        ttk.Button(
+            buttons, text='読み上げる', command=self._on_call_button_click
+        ).grid(row=0, column=0, sticky='w')
+        ttk.Button(
+            buttons,
+            text='ランダムに読み上げる',
+            command=self._on_random_call_button_click,
+        ).grid(row=1, column=0, sticky='w')
+
+        self._status_message_var = tk.StringVar(value='')
+        ttk.Label(self, textvariable=self._status_message_var).grid(
+            row=2, column=1, columnspan=2, sticky='w', padx=padx, pady=pady
+        )
+
+        self.grid_rowconfigure(1, weight=1)
+        for column in range(3):
+            self.grid_columnconfigure(column, weight=1)
+
+    def _on_call_button_click(self) -> None:
+        selection = self._remaining_listbox.curselection()
+        if selection:
+            self._call(selection[0])
+
+    def _on_random_call_button_click(self) -> None:
+        if self._remaining:
+            self._call(random.randrange(len(self._remaining)))
+
+    def _call(self, remaining_i: int) -> None:
+        item = self._remaining.pop(remaining_i)
+        self._remaining_listbox.delete(remaining_i)
+        new_winners = self._caller.call(item)
+
+        num_called = len(self._caller.called)
+        self._called_listbox.insert(
+            tk.END, f'{num_called}. {self._card_set.items[item]}'
+        )
+        self._called_listbox.see(tk.END)
+        for card_i in new_winners:
+            card_id = card_ids.encode_card_id(self._card_set.seed, card_i)
+            self._winners_listbox.insert(
+                tk.END,
+                f'{num_called}回目：{card_id} '
+                f'({self._card_set.describe_card(card_i)})',
+            )
+        self._winners_listbox.see(tk.END)
+        self._update_status()
+
+    def _update_status(self) -> None:
+        self._status_message_var.set(
+            f'{len(self._caller.called)}/{len(self._card_set.items)}回 '
+            f'ビンゴ {len(self._caller.winners)}/{self._card_set.num_cards}枚'
+        )
@@ -0,0 +1,269 @@
+"""
+カード 1 枚のプレビュー
+
+PDF と同じ BingoLayoutSpec / LayoutPlan / PreparedItems で座標を計算し、
+tk.Canvas に描画する。前回から変わった図形だけを作り直す
+
+文字は TkDefaultFont で描く。折り返しや自動縮小の計算には選んだフォントの
+文字幅を使うので、行の分け方と文字の大きさは PDF と同じだが、字形と幅は異なる
+
+フォントの登録 (と reportlab の読み込み) は時間がかかるので、済んでいなければ
+別のスレッドで行い、終わってから描画する
+"""
+
+import threading
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import ttk
+from typing import Any
+from typing import TYPE_CHECKING
+
+from bingo_maker.pdf import card_ids
+from bingo_maker.pdf import fonts
+from bingo_maker.pdf import models
+
+if TYPE_CHECKING:
+    from bingo_maker.pdf import renderer
+
+# 中身のファイルを読み込む前に表示する仮の中身
+PLACEHOLDER_ITEMS = [f'中身{i + 1}' for i in range(100)]
+PREVIEW_SEED = 0
+LOAD_POLL_INTERVAL_MS = 50
+
+# 図形の種類と座標などの組 (前回と同じなら描き直さない)
+_Shape = tuple[Any, ...]
+
+
+def build_card_shapes(
+    title: str,
+    card_items: list[str],
+    spec: models.BingoLayoutSpec,
+    prepared: 'renderer.PreparedItems',
+    scale: float,
+    auto_fit: bool = False,
+) -> dict[str, _Shape]:
+    """左下のカードを、キャンバスの座標 (左上が原点) の図形に変換する
+
+    card_items はマスの順 (xi * cell_size + yi) に並べた中身で、prepared は
+    少なくともそれらを含む
+    """
+    from bingo_maker.pdf import renderer
+
+    plan = renderer.LayoutPlan.from_spec(spec)
+
+    def to_canvas(x: float, y: float) -> tuple[float, float]:
+        return x * scale, (spec.card_h - y) * scale
+
+    shapes: dict[str, _Shape] = {}
+    x, y, w, h = plan.grid_rects[0]
+    shapes['grid_rect'] = ('rect', *to_canvas(x, y + h), *to_canvas(x + w, y))
+    for i, (x1, y1, x2, y2) in enumerate(plan.grid_lines[0]):
+        shapes[f'grid_line{i}'] = (
+            'line',
+            *to_canvas(x1, y1),
+            *to_canvas(x2, y2),
+        )
+    shapes['title'] = (
+        'text',
+        *to_canvas(*plan.title_positions[0]),
+        'center',
+        title,
+        _to_pixels(spec.title_font_size, scale),
+    )
+    shapes['card_id'] = (
+        'text',
+        *to_canvas(*plan.card_id_positions[0]),
+        'right',
+        card_ids.encode_card_id(PREVIEW_SEED, 0),
+        _to_pixels(spec.card_id_font_size, scale),
+    )
+
+    layouts = (
+        prepared.fitted_layouts(
+            spec.font_type,
+            spec.cell_w * renderer.FIT_RATIO,
+            spec.cell_h * renderer.FIT_RATIO,
+        )
+        if auto_fit
+        else prepared.layouts(spec.font_type, spec.item_font_size)
+    )
+    for cell_i, (item, (cx, cy)) in enumerate(
+        zip(card_items, plan.cell_centers[0])
+    ):
+        layout = layouts[item]
+        size = _to_pixels(layout.font_size, scale)
+        for line_i, (line, y_offset) in enumerate(
+            zip(layout.lines, layout.y_offsets)
+        ):
+            shapes[f'cell{cell_i}_{line_i}'] = (
+                'text',
+                *to_canvas(cx, cy + y_offset),
+                'center',
+                line,
+                size,
+            )
+    return shapes
+
+
+def _to_pixels(font_size: float, scale: float) -> int:
+    return max(1, round(font_size * scale))
+
+
+class CardPreview(ttk.Frame):
+    def __init__(
+        self, master: tk.Misc, width: int, height: int, **kwargs: Any
+    ) -> None:
+        super().__init__(master, **kwargs)
+
+        self._canvas = tk.Canvas(
+            self, width=width, height=height, background='white'
+        )
+        self._canvas.grid(row=0, column=0)
+        self._width = width
+        # キーごとのキャンバス上の ID と、描画した図形
+        self._item_ids: dict[str, int] = {}
+        self._shapes: dict[str, _Shape] = {}
+        self._fonts: dict[int, tkfont.Font] = {}
+        # renderer (reportlab) は最初のプレビューまで読み込まない
+        self._prepared: renderer.PreparedItems | None = None
+        self._card_items: list[str] = []
+        # フォントの登録が終わったら描画する引数
+        self._pending: tuple[Any, ...] | None = None
+        self._loader: threading.Thread | None = None
+        self._load_error: Exception | None = None
+
+    @property
+    def loading(self) -> bool:
+        """フォントの登録を待っているか"""
+        return self._loader is not None
+
+    def show(
+        self,
+        title: str,
+        items: list[str],
+        spec: models.BingoLayoutSpec,
+        auto_fit: bool = False,
+    ) -> None:
+        if not fonts.is_registered(spec.font_type):
+            # 登録中なら、終わってから最後に指定された内容で描画する
+            self._pending = (title, items, spec, auto_fit)
+            if self._loader is None:
+                self._loader = threading.Thread(
+                    target=self._load, args=(spec.font_type,), daemon=True
+                )
+                self._loader.start()
+                self.after(LOAD_POLL_INTERVAL_MS, self._poll_loader)
+            return
+
+        from bingo_maker.pdf import renderer
+
+        self._canvas.delete('error')
+        items = items or PLACEHOLDER_ITEMS
+        card = models.BingoData(
+            title=title, items=items, seed=PREVIEW_SEED
+        ).sample_card(0, spec.cell_size)
+        card_items = [items[item_i] for item_i in card]
+        # 文字幅はカードに載る中身の分だけ測り、同じ間は使い回す
+        if self._prepared is None or card_items != self._card_items:
+            self._prepared = renderer.PreparedItems(card_items)
+            self._card_items = card_items
+        shapes = build_card_shapes(
+            title,
+            card_items,
+            spec,
+            self._prepared,
+            self._width / spec.card_w,
+            auto_fit,
+        )
+
+        for key in self._shapes.keys() - shapes.keys():
+            self._canvas.delete(self._item_ids.pop(key))
+        for key, shape in shapes.items():
+            old_shape = self._shapes.get(key)
+            if old_shape == shape:
+                continue
+            if old_shape is not None and old_shape[0] == shape[0]:
+                self._update_shape(self._item_ids[key], shape)
+            else:
+                if old_shape is not None:
+                    self._canvas.delete(self._item_ids[key])
+                self._item_ids[key] = self._create_shape(shape)
+        self._shapes = shapes
+
+    def _load(self, font_type: str) -> None:
+        try:
+            from bingo_maker.pdf import renderer  # noqa: F401
+
+            fonts.ensure_registered(font_type)
+        except Exception as e:
+            self._load_error = e
+
+    def _poll_loader(self) -> None:
+        if self._loader.is_alive():
+            self.after(LOAD_POLL_INTERVAL_MS, self._poll_loader)
+            return
+        self._loader = None
+        pending, self._pending = self._pending, None
+        error, self._load_error = self._load_error, None
+        if error is not None:
+            self._show_error(f'プレビューできません ({error})')
+        elif pending is not None:
+            # 待っている間に別のフォントが選ばれていれば、それを登録する
+            self.show(*pending)
+
+    def _show_error(self, message: str) -> None:
+        self._canvas.delete('all')
+        self._item_ids.clear()
+        self._shapes = {}
+        self._canvas.create_text(
+            self._width / 2,
+            10,
+            text=message,
+            anchor='n',
+            width=self._width,
+            tags='error',
+        )
+
+    def _create_shape(self, shape: _Shape) -> int:
+        kind, *args = shape
+        if kind == 'rect':
+            return self._canvas.create_rectangle(*args)
+        if kind == 'line':
+            return self._canvas.create_line(*args)
+        x, y, align, text, size = args
+        return self._canvas.create_text(
+            x,
+            y,
+            text=text,
+            anchor=self._anchor(align),
+            font=self._font(size),
+        )
+
+    def _update_shape(self, item_id: int, shape: _Shape) -> None:
+        kind, *args = shape
+        if kind != 'text':
+            self._canvas.coords(item_id, *args)
+            return
+        x, y, align, text, size = args
+        self._canvas.coords(item_id, x, y)
+        self._canvas.itemconfigure(
+            item_id,
+            text=text,
+            anchor=self._anchor(align),
+            font=self._font(size),
+        )
+
+    @staticmethod
+    def _anchor(align: str) -> str:
+        # PDF の座標はベースラインなので、文字の下端をそろえて近似する
+        return {'center': 's', 'right': 'se'}[align]
+
+    def _font(self, size: int) -> tkfont.Font:
+        if size not in self._fonts:
+            # 選んだフォントは reportlab にしか登録していないので、Tk の既定の
+            # フォントで近似する (負の大きさはピクセル単位)
+            self._fonts[size] = tkfont.Font(
+                family=tkfont.nametofont('TkDefaultFont').actual('family'),
+                size=-size,
+            )
+        return self._fonts[size]
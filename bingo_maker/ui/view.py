@@ -2,17 +2,28 @@
 https://www.begueradj.com/tkinter-best-practices/
 """
 
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import font as tkfont
+from tkinter import filedialog
 from tkinter import messagebox
 from tkinter import ttk
 from typing import Any
 
 from bingo_maker import utils
+from bingo_maker.pdf import fonts
 from bingo_maker.pdf import models
-from bingo_maker.pdf import renderer
+from bingo_maker.ui import caller
+from bingo_maker.ui import preview
 from bingo_maker.ui import widgets
 
+RENDER_POLL_INTERVAL_MS = 100
+# 連続した入力が落ち着いてからプレビューを描き直す
+PREVIEW_DEBOUNCE_MS = 150
+PREVIEW_WIDTH = 300
+
 
 class BingoMaker(ttk.Frame):
     def __init__(
@@ -27,7 +38,7 @@ class BingoMaker(ttk.Frame):
         bingo_page_height: float,
         bingo_margin_ratio: float,
         bingo_font_types: list[str],
-        **kwargs: Any
+        **kwargs: Any,
     ):
         super().__init__(parent, **kwargs)
         self.parent = parent
@@ -35,6 +46,9 @@ class BingoMaker(ttk.Frame):
         self.bingo_page_width = bingo_page_width
         self.bingo_page_height = bingo_page_height
         self.bingo_margin_ratio = bingo_margin_ratio
+        # 直前に作成したカードの組
+        self._card_set: models.CardSet | None = None
+        self._preview_after_id: str | None = None
 
         self._configure_gui(
             title=app_title, geometry=app_geometry, font_size=app_font_size
@@ -133,11 +147,9 @@ class BingoMaker(ttk.Frame):
         self.fields['font_type'] = widgets.LabelCombobox(
             self,
             label='フォントの種類：',
-            default=next(
-                (ft for ft in font_types if 'regular' in ft.lower()),
-                font_types[0],
-            ),
+            default=fonts.default_font_type(font_types),
             values=font_types,
+            on_select=self._on_font_type_selected,
         )
         self.fields['font_type'].grid(
             row=row_id, column=0, sticky='w', padx=padx, pady=pady
@@ -172,6 +184,18 @@ class BingoMaker(ttk.Frame):
         )
         row_id += 1
 
+        self.fields['auto_fit'] = widgets.BooleanSelector(
+            self,
+            label='中身の大きさの自動調整：',
+            default=False,
+            true_text='あり',
+            false_text='なし',
+        )
+        self.fields['auto_fit'].grid(
+            row=row_id, column=0, sticky='w', padx=padx, pady=pady
+        )
+        row_id += 1
+
         self.fields['output_path'] = widgets.LabelEntry(
             self,
             label='出力ファイル名：',
@@ -192,6 +216,41 @@ class BingoMaker(ttk.Frame):
         self.fields['create_bingo'].grid(
             row=row_id, column=0, sticky='ew', padx=padx, pady=pady
         )
+        row_id += 1
+
+        self.fields['render_progress'] = widgets.RenderProgress(
+            self,
+            label='進捗：',
+            button_text='中止する',
+            command=self._on_cancel_button_click,
+        )
+        self.fields['render_progress'].grid(
+            row=row_id, column=0, sticky='w', padx=padx, pady=pady
+        )
+        self.fields['render_progress'].disable()
+        row_id += 1
+
+        self.fields['open_caller'] = widgets.Button(
+            self,
+            text='読み上げ画面を開く',
+            state='normal',
+            command=self._on_open_caller_button_click,
+        )
+        self.fields['open_caller'].grid(
+            row=row_id, column=0, sticky='ew', padx=padx, pady=pady
+        )
+        row_id += 1
+
+        self.preview = preview.CardPreview(
+            self,
+            width=PREVIEW_WIDTH,
+            height=round(
+                PREVIEW_WIDTH * self.bingo_page_height / self.bingo_page_width
+            ),
+        )
+        self.preview.grid(
+            row=0, column=1, rowspan=row_id, sticky='n', padx=padx, pady=pady
+        )
 
         self.parent.bind(
             widgets.BINGO_ITEM_LOADED_EVENT, self._on_bingo_item_loaded
@@ -199,44 +258,206 @@ class BingoMaker(ttk.Frame):
         self.parent.bind(
             widgets.VALIDITY_CHANGED_EVENT, self._on_validity_changed
         )
+        self.parent.bind(
+            widgets.VALUE_CHANGED_EVENT, lambda _: self._schedule_preview()
+        )
         self.after_idle(self._align_first_columns)
+        # 最初のプレビューはウィンドウを表示してから描く
+        self._schedule_preview()
 
     def _on_render_bingo_button_click(self) -> None:
         for frame in self.fields.values():
             frame.disable()
+        self.fields['render_progress'].enable()
+        self.fields['render_progress'].set_progress(0.0, '')
 
-        renderer.render_bingo_pdf(
-            num_pages=self.fields['num_pages'].get(),
-            data=models.BingoData(
-                title=self.fields['title'].get(),
-                items=self.fields['bingo_items'].get(),
-                allow_duplicates=self.fields['allow_duplicates'].get(),
-            ),
-            spec=models.BingoLayoutSpec(
-                page_w=self.bingo_page_width,
-                page_h=self.bingo_page_height,
-                card_size=self.fields['card_size'].get(),
-                cell_size=self.fields['cell_size'].get(),
-                margin_ratio=self.bingo_margin_ratio,
-                font_type=self.fields['font_type'].get(),
-                title_font_size=self.fields['title_font_size'].get(),
-                item_font_size=self.fields['item_font_size'].get(),
-            ),
+        num_pages = self.fields['num_pages'].get()
+        data = models.BingoData(
+            title=self.fields['title'].get(),
+            items=self.fields['bingo_items'].get(),
+            allow_duplicates=self.fields['allow_duplicates'].get(),
+            seed=models.new_seed(),
+        )
+        spec = models.BingoLayoutSpec(
+            page_w=self.bingo_page_width,
+            page_h=self.bingo_page_height,
+            card_size=self.fields['card_size'].get(),
+            cell_size=self.fields['cell_size'].get(),
+            margin_ratio=self.bingo_margin_ratio,
+            font_type=self.fields['font_type'].get(),
+            title_font_size=self.fields['title_font_size'].get(),
+            item_font_size=self.fields['item_font_size'].get(),
+        )
+        # 読み上げ画面では、同じ seed からカードの中身を作り直す
+        card_set = models.CardSet(
+            items=data.items,
+            allow_duplicates=data.allow_duplicates,
+            seed=data.seed,
+            card_size=spec.card_size,
+            cell_size=spec.cell_size,
+            num_cards=num_pages * spec.card_size**2,
+        )
+        kwargs = dict(
+            num_pages=num_pages,
+            data=data,
+            spec=spec,
             output_path=utils.resolve_output_path(
                 self.fields['output_path'].get()
             ),
+            auto_fit=self.fields['auto_fit'].get(),
         )
 
-        messagebox.showinfo('完了', 'PDFが作成されました。')
+        # 描画は別スレッドで行い、結果はキュー経由でメインスレッドが受け取る
+        self._render_queue: queue.Queue[tuple[str, Any]] = queue.Queue()
+        self._render_cancel_event = threading.Event()
+        self._render_started_at = time.perf_counter()
+        threading.Thread(
+            target=self._render_bingo,
+            args=(card_set,),
+            kwargs=kwargs,
+            daemon=True,
+        ).start()
+        self.after(RENDER_POLL_INTERVAL_MS, self._poll_render_queue)
+
+    def _render_bingo(self, card_set: models.CardSet, **kwargs: Any) -> None:
+        # reportlab の読み込みは重いので、起動時ではなく最初の描画で読み込む
+        from bingo_maker.pdf import renderer
+
+        try:
+            renderer.render_bingo_pdf(
+                **kwargs,
+                progress=lambda done, total: self._render_queue.put(
+                    ('progress', (done, total))
+                ),
+                cancel_event=self._render_cancel_event,
+            )
+            card_set.save(models.CardSet.path_for(kwargs['output_path']))
+        except renderer.RenderCancelled:
+            self._render_queue.put(('cancelled', None))
+        except Exception as e:
+            self._render_queue.put(('error', e))
+        else:
+            self._render_queue.put(('done', card_set))
+
+    def _poll_render_queue(self) -> None:
+        while True:
+            try:
+                kind, value = self._render_queue.get_nowait()
+            except queue.Empty:
+                self.after(RENDER_POLL_INTERVAL_MS, self._poll_render_queue)
+                return
+
+            if kind == 'progress':
+                self._show_render_progress(*value)
+                continue
+
+            self._on_render_finished(kind, value)
+            return
+
+    def _show_render_progress(self, done: int, total: int) -> None:
+        elapsed = time.perf_counter() - self._render_started_at
+        eta = elapsed / done * (total - done)
+        self.fields['render_progress'].set_progress(
+            done / total, f'{done}/{total}ページ　残り約{eta:.0f}秒'
+        )
+
+    def _on_render_finished(self, kind: str, value: Any) -> None:
+        if kind == 'done':
+            self._card_set = value
+            messagebox.showinfo('完了', 'PDFが作成されました。')
+        elif kind == 'cancelled':
+            self.fields['render_progress'].set_progress(0.0, '中止しました')
+        else:
+            messagebox.showerror(
+                'エラー', f'PDFを作成できませんでした。\n{value}'
+            )
 
         for frame in self.fields.values():
             frame.enable()
+        self.fields['render_progress'].disable()
+
+    def _on_cancel_button_click(self) -> None:
+        self._render_cancel_event.set()
+        self.fields['render_progress'].disable()
+
+    def _on_open_caller_button_click(self) -> None:
+        card_set = self._card_set
+        if card_set is None:
+            file_path = filedialog.askopenfilename(
+                parent=self,
+                title='カードの組のファイルを選択',
+                filetypes=[('カードの組', f'*{models.CARD_SET_SUFFIX}')],
+            )
+            if not file_path:
+                return
+            try:
+                card_set = models.CardSet.load(file_path)
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                messagebox.showerror(
+                    'エラー', f'カードの組を読み込めませんでした。\n{e}'
+                )
+                return
+
+        caller.CallerWindow(self.parent, card_set)
+
+    def _on_font_type_selected(self, font_type: str) -> None:
+        # フォントの読み込みは重いので、選択された時点で裏で済ませておく
+        threading.Thread(
+            target=fonts.ensure_registered, args=(font_type,), daemon=True
+        ).start()
 
     def _on_bingo_item_loaded(self, event: tk.Event) -> None:
         if len(event.widget.get()) < self.fields['cell_size'].get() ** 2:
             self.fields['allow_duplicates'].disable_option('false')
         else:
             self.fields['allow_duplicates'].enable_option('false')
+        self._schedule_preview()
+
+    def update_preview(self) -> None:
+        """待たずにプレビューを描き直す"""
+        if self._preview_after_id is not None:
+            self.after_cancel(self._preview_after_id)
+        self._update_preview()
+
+    def _schedule_preview(self) -> None:
+        if self._preview_after_id is not None:
+            self.after_cancel(self._preview_after_id)
+        self._preview_after_id = self.after(
+            PREVIEW_DEBOUNCE_MS, self._update_preview
+        )
+
+    def _update_preview(self) -> None:
+        self._preview_after_id = None
+        keys = [
+            'title',
+            'card_size',
+            'cell_size',
+            'font_type',
+            'title_font_size',
+            'item_font_size',
+        ]
+        # 入力途中で値が不正な間は、前回のプレビューのままにする
+        if not all(self.fields[key].is_valid() for key in keys):
+            return
+        try:
+            spec = models.BingoLayoutSpec(
+                page_w=self.bingo_page_width,
+                page_h=self.bingo_page_height,
+                card_size=self.fields['card_size'].get(),
+                cell_size=self.fields['cell_size'].get(),
+                margin_ratio=self.bingo_margin_ratio,
+                font_type=self.fields['font_type'].get(),
+                title_font_size=self.fields['title_font_size'].get(),
+                item_font_size=self.fields['item_font_size'].get(),
+            )
+        except tk.TclError:
+            return
+        self.preview.show(
+            self.fields['title'].get(),
+            self.fields['bingo_items'].get(),
+            spec,
+            auto_fit=self.fields['auto_fit'].get(),
+        )
 
     def _on_validity_changed(self, event: tk.Event) -> None:
         if all([frame.is_valid() for frame in self.fields.values()]):
@@ -265,7 +486,7 @@ class BingoMaker(ttk.Frame):
         for key, frame in self.fields.items():
             size = (
                 max_1st_col_width + max_2nd_col_width
-                if key == 'create_bingo'
+                if key in ['create_bingo', 'open_caller']
                 else max_1st_col_width
             )
             frame.grid_columnconfigure(0, minsize=size)
@@ -2,12 +2,15 @@ import abc
 from collections.abc import Callable
 import functools
 import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import filedialog
 from tkinter import ttk
 from typing import Any
 from typing import Literal
 
+from bingo_maker import item_loader
 from bingo_maker import utils
 
 ERROR_MESSAGES = {
@@ -19,6 +22,8 @@ ERROR_MESSAGES = {
 }
 VALIDITY_CHANGED_EVENT = '<<ValidityChanged>>'
 BINGO_ITEM_LOADED_EVENT = '<<BingoItemLoaded>>'
+VALUE_CHANGED_EVENT = '<<ValueChanged>>'
+LOAD_POLL_INTERVAL_MS = 100
 
 
 class ValidatableFrame(ttk.Frame, abc.ABC):
@@ -26,6 +31,12 @@ class ValidatableFrame(ttk.Frame, abc.ABC):
         super().__init__(master, **kwargs)
         self._is_valid_var = tk.BooleanVar(value=False)
 
+    def _notify_value_changed(self, var: tk.Variable) -> None:
+        var.trace_add(
+            'write',
+            lambda *_: self.event_generate(VALUE_CHANGED_EVENT, when='tail'),
+        )
+
     def _set_validity(self, is_valid: bool) -> None:
         if self._is_valid_var.get() is not is_valid:
             self._is_valid_var.set(is_valid)
@@ -59,6 +70,7 @@ class LabelEntry(ValidatableFrame):
         super().__init__(master, **kwargs)
 
         self._entry_var = tk.StringVar(value=default)
+        self._notify_value_changed(self._entry_var)
         self._error_message_var = tk.StringVar(value='')
         self._validate(default)
 
@@ -119,6 +131,7 @@ class LabelSpinbox(ValidatableFrame):
             if all(n.is_integer() for n in [default, from_, to, increment])
             else tk.DoubleVar(value=default)
         )
+        self._notify_value_changed(self._spinbox_var)
         self._error_message_var = tk.StringVar(value='')
         self._validate_on_input(str(default))
 
@@ -215,12 +228,14 @@ class LabelCombobox(ValidatableFrame):
         label: str,
         default: str,
         values: list[str] | tuple[str, ...],
+        on_select: Callable[[str], None] | None = None,
         **kwargs: Any,
     ):
         super().__init__(master, **kwargs)
 
         self._set_validity(True)  # バリデーションなし
         self._combobox_var = tk.StringVar(value=default)
+        self._notify_value_changed(self._combobox_var)
 
         ttk.Label(self, text=label, anchor='w').grid(
             row=0, column=0, sticky='w'
@@ -233,6 +248,10 @@ class LabelCombobox(ValidatableFrame):
             textvariable=self._combobox_var,
         )
         self._combobox.grid(row=0, column=1, sticky='w')
+        if on_select is not None:
+            self._combobox.bind(
+                '<<ComboboxSelected>>', lambda _: on_select(self.get())
+            )
 
     def get(self) -> str:
         return self._combobox_var.get()
@@ -258,6 +277,7 @@ class BooleanSelector(ValidatableFrame):
 
         self._set_validity(True)  # バリデーションなし
         self._radiobutton_var = tk.BooleanVar(value=default)
+        self._notify_value_changed(self._radiobutton_var)
         self._radiobuttons: dict[str, ttk.Widget] = {}
 
         ttk.Label(self, text=label, anchor='w').grid(
@@ -328,25 +348,78 @@ class BingoItemFileLoader(ValidatableFrame):
 
     def _on_button_click(self, title: str) -> None:
         file_path = filedialog.askopenfilename(
-            parent=self, title=title, filetypes=[('テキストファイル', '*.txt')]
+            parent=self,
+            title=title,
+            filetypes=[
+                (
+                    'ビンゴの中身',
+                    ' '.join(f'*{s}' for s in item_loader.SUFFIXES),
+                ),
+                ('テキストファイル', '*.txt'),
+                ('CSV ファイル', '*.csv'),
+                ('JSON ファイル', '*.json *.jsonl'),
+            ],
         )
         if not file_path:
             return
 
-        self._items = self._load_items_from_file(file_path)
-        self._status_message_var.set(
-            f'{os.path.basename(file_path)}：{len(self._items)}種類'
+        # 大きなファイルでも画面が固まらないように、別スレッドで読み込む
+        self._button.state(['disabled'])
+        self._load_queue: queue.Queue[tuple[str, Any]] = queue.Queue()
+        threading.Thread(
+            target=self._load_items, args=(file_path,), daemon=True
+        ).start()
+        self.after(
+            LOAD_POLL_INTERVAL_MS,
+            functools.partial(
+                self._poll_load_queue, os.path.basename(file_path)
+            ),
         )
-        self._set_validity(True)
-        self.event_generate(BINGO_ITEM_LOADED_EVENT, when='tail')
-
-    @staticmethod
-    def _load_items_from_file(file_path: str) -> list[str]:
-        with open(file_path, encoding='utf-8') as f:
-            items = (line.strip() for line in f.readlines())
-            return sorted(
-                {item for item in items if item and not item.startswith('#')}
+
+    def _load_items(self, file_path: str) -> None:
+        try:
+            items = item_loader.load_items_from_file(
+                file_path,
+                progress=lambda ratio: self._load_queue.put(
+                    ('progress', ratio)
+                ),
             )
+        except Exception as e:
+            # 想定外の例外でも知らせないと、読み込みの完了を待ち続ける
+            self._load_queue.put(('error', e))
+        else:
+            self._load_queue.put(('done', items))
+
+    def _poll_load_queue(self, file_name: str) -> None:
+        while True:
+            try:
+                kind, value = self._load_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                self._status_message_var.set(
+                    f'{file_name}：読み込み中 {value:.0%}'
+                )
+                continue
+
+            self._button.state(['!disabled'])
+            if kind == 'done':
+                self._items = value
+                self._status_message_var.set(
+                    f'{file_name}：{len(self._items)}種類'
+                )
+                self._set_validity(True)
+                self.event_generate(BINGO_ITEM_LOADED_EVENT, when='tail')
+            else:
+                self._status_message_var.set(
+                    f'{file_name}：読み込めませんでした ({value})'
+                )
+            return
+
+        self.after(
+            LOAD_POLL_INTERVAL_MS,
+            functools.partial(self._poll_load_queue, file_name),
+        )
 
     def get(self) -> list[str]:
         return self._items
@@ -358,6 +431,53 @@ class BingoItemFileLoader(ValidatableFrame):
         self._button.state(['disabled'])
 
 
+class RenderProgress(ValidatableFrame):
+    def __init__(
+        self,
+        master: tk.Misc,
+        label: str,
+        button_text: str,
+        command: Callable[[], None],
+        length: int = 200,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(master, **kwargs)
+
+        self._set_validity(True)  # バリデーションなし
+        self._progress_var = tk.DoubleVar(value=0.0)
+        self._status_message_var = tk.StringVar(value='')
+
+        ttk.Label(self, text=label, anchor='w').grid(
+            row=0, column=0, sticky='w'
+        )
+
+        ttk.Progressbar(
+            self, variable=self._progress_var, maximum=1.0, length=length
+        ).grid(row=0, column=1, sticky='w')
+
+        self._button = ttk.Button(
+            self, text=button_text, state='disabled', command=command
+        )
+        self._button.grid(row=0, column=2, sticky='w')
+
+        ttk.Label(self, textvariable=self._status_message_var).grid(
+            row=1, column=1, columnspan=2, sticky='w'
+        )
+
+    def set_progress(self, ratio: float, message: str) -> None:
+        self._progress_var.set(ratio)
+        self._status_message_var.set(message)
+
+    def get(self) -> float:
+        return self._progress_var.get()
+
+    def enable(self) -> None:
+        self._button.state(['!disabled'])
+
+    def disable(self) -> None:
+        self._button.state(['disabled'])
+
+
 class Button(ValidatableFrame):
     def __init__(
         self,
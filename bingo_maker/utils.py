@@ -1,3 +1,4 @@
+import os
 import pathlib
 import sys
 
@@ -32,3 +33,20 @@ def resolve_output_path(
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     return output_path
+
+
+def resolve_cache_dir(relative_path: str) -> pathlib.Path:
+    """ディレクトリを作れなければ OSError を送出する"""
+    if 'BINGO_MAKER_CACHE_DIR' in os.environ:
+        base_dir = pathlib.Path(os.environ['BINGO_MAKER_CACHE_DIR'])
+    else:
+        base_dir = (
+            pathlib.Path(
+                os.environ.get('LOCALAPPDATA', pathlib.Path.home() / '.cache')
+            )
+            / 'bingo-maker'
+        )
+    cache_dir = base_dir / relative_path
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    return cache_dir